@@ -0,0 +1,239 @@
+"""
+Pipeline Microbenchmarks
+Times the data-lookup hot paths against synthetic VIN and OEM catalogs of
+configurable size, and writes machine-readable results for run-to-run
+comparison
+
+Benchmarks (per call):
+    decode_vin_from_dataset (once over the CSV VinIndex, once over the
+    binary VinStore), get_available_parts_for_vehicle,
+    find_matching_oem_parts, get_labor_hours, consolidate_detections,
+    calculate_part_cost
+plus the one-off build/load of the VIN store, VIN index and parts catalog
+at each size. The structural VIN tables are built too, so VIN misses take
+the structural fallback as in production.
+
+The synthetic vin_dataset.csv / oem_parts_data.csv (synthetic_data.py)
+are written to a temporary directory that the benchmark runs in, so real data files are
+never touched.
+
+Usage:
+    python benchmark_pipeline.py --sizes 10000 100000 1000000 --output bench.json
+    python benchmark_pipeline.py --sizes 10000 --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+import cost_estimation_pipeline as pipeline
+import labor_rates
+import parts_catalog
+import vin_index
+import vin_structure
+from synthetic_data import MAKE_NAMES, oem_parts_frame, vin_frame
+from vin_store import VIN_STORE_PATH, VinStore, build_vin_store
+
+REPO_DIR = Path(__file__).resolve().parent
+
+CONFIG = {
+    'sizes': [10_000, 100_000, 1_000_000],
+    'calls': 200,      # Calls per round
+    'rounds': 5,
+    'seed': 42,
+}
+
+def reset_shared_data():
+    """Drop the process-wide tables so the next call loads the current files"""
+    vin_index._vin_index = None
+    vin_structure._structural_decoder = None
+    parts_catalog._parts_catalog = None
+    labor_rates._labor_table = None
+
+
+# ============================================================
+# TIMING
+# ============================================================
+
+def time_calls(fn: Callable[[int], Any], calls: int, rounds: int) -> Dict[str, float]:
+    """Per-call microseconds over rounds × calls (fn receives the call index)"""
+    fn(0)  # Warm caches
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for i in range(calls):
+            fn(i)
+        per_call.append((time.perf_counter() - start) / calls * 1e6)
+
+    return {
+        'median_us': statistics.median(per_call),
+        'min_us': min(per_call),
+        'stdev_us': statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        'ops_per_s': 1e6 / statistics.median(per_call),
+        'calls': calls,
+        'rounds': rounds,
+    }
+
+
+def time_once(fn: Callable[[], Any]) -> Dict[str, float]:
+    start = time.perf_counter()
+    fn()
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    return {'median_us': elapsed_us, 'min_us': elapsed_us, 'stdev_us': 0.0,
+            'ops_per_s': 1e6 / elapsed_us, 'calls': 1, 'rounds': 1}
+
+
+def make_detections(rng: np.random.Generator, count: int) -> List[Dict]:
+    classes = list(pipeline.ML_CLASS_TO_OEM_PARTS)
+    damages = list(pipeline.DAMAGE_ACTION_MAP)
+    return [
+        {
+            'part': classes[rng.integers(len(classes))],
+            'part_confidence': float(rng.uniform(0.7, 1.0)),
+            'damage_types': [(damages[d], float(rng.uniform(0.6, 1.0)))
+                             for d in rng.choice(len(damages), 2, replace=False)],
+            'action': 'replace' if rng.random() < 0.4 else 'repair',
+        }
+        for _ in range(count)
+    ]
+
+
+def run_size(rows: int, calls: int, rounds: int, seed: int) -> List[Dict[str, Any]]:
+    """All benchmarks against catalogs of one size (run inside the working directory)"""
+    rng = np.random.default_rng(seed)
+    vin_df = vin_frame(rows, rng)
+    oem_df = oem_parts_frame(rows, rng)
+    vin_df.to_csv(vin_index.VIN_DATASET_PATH, index=False)
+    oem_df.to_csv(parts_catalog.OEM_PARTS_PATH, index=False)
+
+    vin_structure.build_structure_tables(vin_index.VIN_DATASET_PATH, vin_structure.VIN_STRUCTURE_PATH)
+
+    reset_shared_data()
+    results = {'build_vin_store': time_once(lambda: build_vin_store(vin_index.VIN_DATASET_PATH, VIN_STORE_PATH))}
+    lookups = {}
+    results['load_vin_index'] = time_once(
+        lambda: lookups.setdefault('index', vin_index.VinIndex.from_csv(vin_index.VIN_DATASET_PATH)))
+    results['load_vin_store'] = time_once(lambda: lookups.setdefault('store', VinStore(VIN_STORE_PATH)))
+    results['load_parts_catalog'] = time_once(lambda: parts_catalog.get_parts_catalog(pipeline.ML_CLASS_TO_OEM_PARTS))
+
+    # Half exact hits, half misses (prefix search + structural fallback)
+    hits = vin_df['VIN'].sample(calls, random_state=seed, replace=True).tolist()
+    misses = vin_frame(calls, rng)['VIN'].tolist()
+    lookup_vins = [vin for pair in zip(hits, misses) for vin in pair]
+
+    vehicles = [{'make': make} for make in rng.choice(MAKE_NAMES, calls)]
+    classes = list(pipeline.ML_CLASS_TO_OEM_PARTS)
+    class_picks = [classes[c] for c in rng.integers(0, len(classes), calls)]
+    make_parts = {make: pipeline.get_available_parts_for_vehicle({'make': make})[1] for make in MAKE_NAMES}
+    detection_sets = [make_detections(rng, 30) for _ in range(calls)]
+    matched_parts = [pipeline.find_matching_oem_parts(class_picks[i], make_parts[vehicles[i]['make']])
+                     for i in range(calls)]
+    actions = ['repair', 'replace']
+
+    # Same VINs through both lookup backends (get_vin_index picks the store once it is built)
+    for backend in ('index', 'store'):
+        vin_index._vin_index = lookups[backend]
+        results[f'decode_vin_from_dataset[{backend}]'] = time_calls(
+            lambda i: pipeline.decode_vin_from_dataset(lookup_vins[i % len(lookup_vins)]), calls, rounds)
+    results['get_available_parts_for_vehicle'] = time_calls(
+        lambda i: pipeline.get_available_parts_for_vehicle(vehicles[i]), calls, rounds)
+    results['find_matching_oem_parts'] = time_calls(
+        lambda i: pipeline.find_matching_oem_parts(class_picks[i], make_parts[vehicles[i]['make']]), calls, rounds)
+    results['get_labor_hours'] = time_calls(
+        lambda i: pipeline.get_labor_hours(class_picks[i]), calls, rounds)
+    results['consolidate_detections'] = time_calls(
+        lambda i: pipeline.consolidate_detections([dict(d) for d in detection_sets[i]]), calls, rounds)
+    results['calculate_part_cost'] = time_calls(
+        lambda i: pipeline.calculate_part_cost(class_picks[i], actions[i % 2], matched_parts[i]), calls, rounds)
+
+    return [{'benchmark': name, 'rows': rows, **stats} for name, stats in results.items()]
+
+
+# ============================================================
+# REPORTING
+# ============================================================
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results: List[Dict], baseline_path: str):
+    """Print median per-call time against a previous run (ratio > 1 = slower now)"""
+    with open(baseline_path, 'r') as f:
+        baseline = {(r['benchmark'], r['rows']): r for r in json.load(f)['results']}
+
+    print(f"\n  {'Benchmark':<34} {'rows':>9} {'baseline µs':>12} {'now µs':>10} {'ratio':>7}")
+    for r in results:
+        before = baseline.get((r['benchmark'], r['rows']))
+        if before is None:
+            continue
+        ratio = r['median_us'] / before['median_us']
+        flag = '  ⚠' if ratio > 1.10 else ''
+        print(f"  {r['benchmark']:<34} {r['rows']:>9} {before['median_us']:>12.1f} {r['median_us']:>10.1f} {ratio:>7.2f}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Microbenchmarks for the pipeline lookup hot paths')
+    parser.add_argument('--sizes', type=int, nargs='+', default=CONFIG['sizes'], help='Catalog rows (10k to 5M)')
+    parser.add_argument('--calls', type=int, default=CONFIG['calls'])
+    parser.add_argument('--rounds', type=int, default=CONFIG['rounds'])
+    parser.add_argument('--seed', type=int, default=CONFIG['seed'])
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+    args = parser.parse_args()
+
+    print("="*70)
+    print("PIPELINE MICROBENCHMARKS")
+    print("="*70)
+
+    workdir = tempfile.mkdtemp(prefix='pipeline_bench_')
+    shutil.copy(REPO_DIR / labor_rates.LABOR_HOURS_PATH, workdir)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+
+    results = []
+    try:
+        for rows in args.sizes:
+            print(f"\n[{rows:,} rows]")
+            size_results = run_size(rows, args.calls, args.rounds, args.seed)
+            for r in size_results:
+                print(f"  ✓ {r['benchmark']:<34} {r['median_us']:>12.1f} µs  ({r['ops_per_s']:,.0f} ops/s)")
+            results.extend(size_results)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        reset_shared_data()
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'config': vars(args), 'results': results}, f, indent=2)
+        print(f"\n✓ Results saved to {args.output}")
@@ -0,0 +1,78 @@
+"""
+Batched Cost Engine
+Costs any number of parts in one NumPy pass:
+parts cost, labor hours, labor cost, subtotal and total with tax
+
+Works on plain arrays so bulk re-estimation jobs can re-cost many claims
+at once when rates change. Formatting is left to the output layer.
+"""
+
+from typing import Dict, Any, Sequence
+
+import numpy as np
+
+COST_FIELDS = ['oem_price', 'parts_cost', 'labor_hours', 'labor_cost', 'subtotal', 'total_with_tax']
+
+
+def compute_costs(actions: Sequence[str],
+                  oem_prices: Sequence[float],
+                  repair_hours: Sequence[float],
+                  replacement_hours: Sequence[float],
+                  labor_rate: float,
+                  sales_tax: float) -> Dict[str, np.ndarray]:
+    """
+    Cost every part at once
+
+    Args:
+        actions: 'replace' or 'repair' per part
+        oem_prices: OEM price per part, NaN where no price is known
+        repair_hours / replacement_hours: labor hours per part
+        labor_rate: $/hour
+        sales_tax: multiplier (1.06 = 6%)
+
+    Returns:
+        Dict of arrays: is_replace, has_oem_data plus COST_FIELDS
+        (oem_price is NaN for repairs and unknown prices)
+
+    Replacement: (OEM price + labor_rate × replacement hours) × tax, labor only if no price
+    Repair:      labor_rate × repair hours × tax
+    """
+    is_replace = np.asarray(actions, dtype=object) == 'replace'
+    oem_prices = np.asarray(oem_prices, dtype=np.float64)
+    has_price = ~np.isnan(oem_prices)
+
+    oem_price = np.where(is_replace, oem_prices, np.nan)
+    parts_cost = np.where(is_replace & has_price, oem_prices, 0.0)
+    labor_hours = np.where(
+        is_replace,
+        np.asarray(replacement_hours, dtype=np.float64),
+        np.asarray(repair_hours, dtype=np.float64),
+    )
+    labor_cost = labor_rate * labor_hours
+    subtotal = parts_cost + labor_cost
+    total_with_tax = subtotal * sales_tax
+
+    return {
+        'is_replace': is_replace,
+        'has_oem_data': ~is_replace | has_price,
+        'oem_price': oem_price,
+        'parts_cost': parts_cost,
+        'labor_hours': labor_hours,
+        'labor_cost': labor_cost,
+        'subtotal': subtotal,
+        'total_with_tax': total_with_tax,
+    }
+
+
+def cost_row(costs: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+    """One part's costs as plain Python values (same keys as calculate_part_cost)"""
+    oem_price = costs['oem_price'][i]
+    return {
+        'action': 'Replace' if costs['is_replace'][i] else 'Repair',
+        'oem_price': None if np.isnan(oem_price) else float(oem_price),
+        'labor_hours': float(costs['labor_hours'][i]),
+        'labor_cost': float(costs['labor_cost'][i]),
+        'subtotal': float(costs['subtotal'][i]),
+        'total_with_tax': float(costs['total_with_tax'][i]),
+        'has_oem_data': bool(costs['has_oem_data'][i]),
+    }
@@ -3,9 +3,22 @@ Complete Cost Estimation Pipeline
 VIN → Vehicle ID → Part Detection → Damage Assessment → Cost Calculation
 """
 
+import time
+
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Iterable
+
+from cost_engine import compute_costs, cost_row
+from image_preprocessing import preprocess_images
+from labor_rates import get_labor_table
+from model_adapters import predict_arrays, shared_multi_head
+from part_matcher import PartDescriptionClassifier
+from parts_catalog import get_parts_catalog
+from pipeline_metrics import get_metrics_sink, record_model, stage, timed_estimate, timing_active
+from prediction_cache import image_key
+from vin_index import get_vin_index
+from vin_structure import get_structural_decoder, normalize_vin, validate_vin
 
 # ============================================================
 # CONSTANTS
@@ -50,6 +63,20 @@ ML_CLASS_TO_OEM_PARTS = {
     'License-plate': ['license plate', 'plate bracket']
 }
 
+# Detection thresholds on the model's sigmoid outputs
+PART_THRESHOLD = 0.70
+DAMAGE_THRESHOLD = 0.60
+
+# Cascaded inference: minimum screen-model probability for an image to reach the part model
+SCREEN_THRESHOLD = 0.50
+# Cost of one screen-model pass relative to one full-model pass (for the compute-saved stats),
+# used when the screen model has no 'relative_cost' attribute
+SCREEN_PASS_COST = 1.0
+
+# Multi-pattern matcher over all search terms (longer terms of another class win)
+# for part frames that are not a catalog partition (results cached per description)
+PART_CLASSIFIER = PartDescriptionClassifier(ML_CLASS_TO_OEM_PARTS, cache_size=100_000)
+
 # ML class to labor hours part name mapping
 ML_CLASS_TO_LABOR_PART = {
     'Front-bumper': 'Front-bumper',
@@ -80,29 +107,55 @@ ML_CLASS_TO_LABOR_PART = {
 # STEP 1: VIN DECODING
 # ============================================================
 
+def _native_value(value):
+    """numpy scalar → Python scalar, missing (NaN) → None, so results serialize as JSON"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
 def decode_vin_from_dataset(vin: str) -> Dict[str, Any]:
     """
     Decode VIN using the VIN dataset
     Returns vehicle information or None if not found
+    
+    The dataset is loaded once per process into a VinIndex:
+    exact match by hash, then partial match on the first 11 chars (WMI + VDS).
+    VINs absent from the dataset fall back to structural decoding
+    (WMI → make, VDS → model, position 10 → year) when the tables are built.
+    Fields are plain Python values (missing → None, year as int).
     """
-    vin_df = pd.read_csv('vin_dataset.csv')
+    vehicle_info = get_vin_index().lookup(vin)
     
-    # Try exact match first
-    vehicle_match = vin_df[vin_df['VIN'] == vin]
+    if vehicle_info is None:
+        decoder = get_structural_decoder()
+        if decoder is not None:
+            vehicle_info = decoder.decode(vin)
     
-    if vehicle_match.empty:
-        # Try partial matching (first 11 chars = WMI + VDS)
-        vin_prefix = vin[:11]
-        vehicle_match = vin_df[vin_df['VIN'].str.startswith(vin_prefix)]
+    if vehicle_info is None:
+        return None
     
-    if not vehicle_match.empty:
-        return {
-            'make': vehicle_match.iloc[0]['Make'],
-            'model': vehicle_match.iloc[0]['Model'],
-            'year': vehicle_match.iloc[0]['Year'],
-        }
+    vehicle_info = {field: _native_value(value) for field, value in vehicle_info.items()}
+    if isinstance(vehicle_info.get('year'), float):  # Year column read as float when it has gaps
+        vehicle_info['year'] = int(vehicle_info['year'])
+    return vehicle_info
+
+
+def decode_vins(vins: Iterable[str]) -> pd.DataFrame:
+    """
+    Decode a batch of VINs in one vectorized pass
+    Returns a DataFrame with one row per input VIN:
+        vin, make, model, year, match ('exact', 'prefix', 'structure' or 'miss')
+    """
+    decoded = get_vin_index().lookup_many(vins)
     
-    return None
+    decoder = get_structural_decoder()
+    if decoder is not None:
+        decoded = decoder.fill_misses(decoded)
+    
+    return decoded
 
 
 # ============================================================
@@ -114,24 +167,13 @@ def get_available_parts_for_vehicle(vehicle_info: Dict) -> Tuple[List[str], pd.D
     Get parts available for this specific vehicle from OEM database
     Returns: (available_classes, vehicle_parts_dataframe)
     """
-    oem_df = pd.read_csv('oem_parts_data.csv')
-    
-    # Filter by make (case-insensitive)
-    vehicle_parts = oem_df[
-        oem_df['Make'].str.upper() == vehicle_info['make'].upper()
-    ]
+    catalog = get_parts_catalog(ML_CLASS_TO_OEM_PARTS)
     
-    # Get unique part types available
-    available_part_descriptions = vehicle_parts['Part Description'].unique()
+    # Per-make partition of the catalog (loaded once, keyed by upper-cased make)
+    vehicle_parts = catalog.parts_for_make(vehicle_info['make'])
     
-    # Map to ML classes
-    available_classes = []
-    for ml_class, search_terms in ML_CLASS_TO_OEM_PARTS.items():
-        # Check if any OEM part matches this ML class
-        for desc in available_part_descriptions:
-            if any(term in desc.lower() for term in search_terms):
-                available_classes.append(ml_class)
-                break
+    # ML classes with at least one matching OEM part (indexed at catalog load)
+    available_classes = catalog.available_classes(vehicle_info['make'])
     
     return available_classes, vehicle_parts
 
@@ -140,7 +182,44 @@ def get_available_parts_for_vehicle(vehicle_info: Dict) -> Tuple[List[str], pd.D
 # STEP 3: PART DETECTION & DAMAGE ASSESSMENT
 # ============================================================
 
-def detect_parts_and_damage(image, part_model, damage_model, available_classes: List[str]) -> List[Dict]:
+def _predict_arrays(model, images: List, cache=None, keys: List[str] = None,
+                    role: str = 'model') -> Tuple[List[str], np.ndarray]:
+    """
+    (classes, (N, C) probabilities), through the prediction cache when one is given
+    Timed per model role when pipeline timing is active
+    """
+    start = time.perf_counter() if timing_active() else None
+    
+    if cache is None:
+        outputs = predict_arrays(model, images)
+    else:
+        outputs = cache.predict_arrays(model, images, keys)
+    
+    if start is not None:
+        record_model(role, len(images), time.perf_counter() - start)
+    return outputs
+
+
+def _predict_heads(adapter, images: List, cache=None, keys: List[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Both heads of a shared-backbone model from one forward pass over the images
+    Timed as a single 'multi_head_model' call when pipeline timing is active
+    """
+    start = time.perf_counter() if timing_active() else None
+    
+    if cache is None:
+        outputs = adapter.forward(images)
+    else:
+        outputs = cache.predict_heads(adapter, images, keys)
+    
+    if start is not None:
+        record_model('multi_head_model', len(images), time.perf_counter() - start)
+    # float32 like the heads' own predict_array
+    return {head: np.asarray(probs, dtype=np.float32) for head, probs in outputs.items()}
+
+
+def detect_parts_and_damage(image, part_model, damage_model, available_classes: List[str],
+                            cache=None) -> List[Dict]:
     """
     Run both models on image and combine results
     
@@ -149,49 +228,173 @@ def detect_parts_and_damage(image, part_model, damage_model, available_classes:
         part_model: Trained part identification model
         damage_model: Trained damage classification model
         available_classes: List of part classes valid for this vehicle
+        cache: Optional PredictionCache consulted before running either model
     
     Returns:
         List of detected parts with damage assessment
     """
-    # Run part identification model
-    # Expected output: dict of {class_name: probability}
-    all_part_predictions = part_model.predict(image)
+    return detect_parts_and_damage_batch([image], part_model, damage_model, available_classes, cache)[0]
+
+
+def detect_parts_and_damage_batch(images: List, part_model, damage_model,
+                                  available_classes: List[str], cache=None,
+                                  keys: List[str] = None) -> List[List[Dict]]:
+    """
+    Run both models over all of a claim's images at once
+    
+    Each model is invoked once per claim rather than once per image;
+    the damage model only sees images with at least one detected part.
+    When both models are heads of one MultiHeadModelAdapter, a single
+    forward pass over the claim serves both heads instead.
+    Outputs stay (images × classes) arrays: thresholds and the vehicle's
+    available-class mask are applied as array ops.
+    With a PredictionCache, images seen before (same pixels, same model version)
+    are served from the cache and only the rest go to the models.
+    
+    keys: image_key() per image, when the caller already hashed them for the cache
     
-    # Filter to available classes and apply threshold
+    Returns:
+        One list of detections per image (same format as detect_parts_and_damage)
+    """
+    # Hash each image once, shared by both models' cache lookups
+    if keys is None:
+        keys = [image_key(image) for image in images] if cache is not None else [None] * len(images)
+    
+    multi_head = shared_multi_head(part_model, damage_model)
+    if multi_head is not None:
+        head_probs = _predict_heads(multi_head, images, cache, keys)
+        part_classes, part_probs = part_model.classes, head_probs['parts']
+    else:
+        # Run part identification model
+        # Output: (images × part classes) probabilities aligned to the model's classes
+        part_classes, part_probs = _predict_arrays(part_model, images, cache, keys, 'part_model')
+    
+    # Filter to available classes and apply threshold (one boolean mask for the claim)
+    available_mask = np.isin(np.asarray(part_classes, dtype=object), list(available_classes))
+    part_hits = (part_probs > PART_THRESHOLD) & available_mask
+    
+    # Run damage classification model on images with detected parts
+    # Output: (images with parts × damage types) probabilities
+    damage_idx = np.flatnonzero(part_hits.any(axis=1)).tolist()
+    if multi_head is not None:
+        damage_classes, damage_probs = damage_model.classes, head_probs['damage'][damage_idx]
+    elif not damage_idx:
+        # No parts detected anywhere: skip the damage model call
+        damage_classes, damage_probs = [], np.empty((0, 0), dtype=np.float32)
+    else:
+        damage_classes, damage_probs = _predict_arrays(
+            damage_model, [images[idx] for idx in damage_idx], cache, [keys[idx] for idx in damage_idx],
+            'damage_model'
+        )
+    damage_hits = damage_probs > DAMAGE_THRESHOLD
+    damage_rows = {idx: row for row, idx in enumerate(damage_idx)}
+    
+    # Dicts are only built for the parts and damages that passed
     detected_parts = [
-        (part_class, prob)
-        for part_class, prob in all_part_predictions.items()
-        if part_class in available_classes and prob > 0.70
+        [(part_classes[c], float(part_probs[idx, c])) for c in np.flatnonzero(part_hits[idx])]
+        for idx in range(len(images))
     ]
     
-    if not detected_parts:
-        return []
+    all_detections = []
+    for idx, parts in enumerate(detected_parts):
+        if not parts:
+            all_detections.append([])
+            continue
+        
+        # Damages above threshold
+        row = damage_rows[idx]
+        detected_damages = [
+            (damage_classes[c], float(damage_probs[row, c]))
+            for c in np.flatnonzero(damage_hits[row])
+        ]
+        
+        # Determine action based on damage types
+        action = determine_action(detected_damages)
+        
+        # Combine results
+        all_detections.append([
+            {
+                'part': part_class,
+                'part_confidence': part_confidence,
+                'damage_types': detected_damages,
+                'action': action
+            }
+            for part_class, part_confidence in parts
+        ])
+    
+    return all_detections
+
+
+def detect_parts_and_damage_cascade(images: List, part_model, damage_model,
+                                    available_classes: List[str],
+                                    screen_model=None, cache=None,
+                                    screen_cost: float = None) -> Tuple[List[List[Dict]], Dict[str, Any]]:
+    """
+    Cheap-first cascaded detection: screen → part model → damage model
     
-    # Run damage classification model
-    # Expected output: dict of {damage_type: probability}
-    damage_predictions = damage_model.predict(image)
+    1. Optional screen_model (e.g. a low-resolution classifier) runs on every image;
+       images whose highest probability is below SCREEN_THRESHOLD (close-ups,
+       interior shots, VIN plates) are dropped
+    2. The part model runs on the remaining images
+    3. The damage model only runs on images with an eligible part
+       (a multi-head model produces both heads in the part pass)
     
-    # Filter damages above threshold
-    detected_damages = [
-        (damage_type, prob)
-        for damage_type, prob in damage_predictions.items()
-        if prob > 0.60
-    ]
+    Compute saved is measured in full-model passes against running both models
+    on every image; each screen pass counts screen_cost full passes (default: the
+    screen model's 'relative_cost' attribute, else SCREEN_PASS_COST), so a screen
+    that drops few images can make the saving negative.
     
-    # Determine action based on damage types
-    action = determine_action(detected_damages)
+    Returns:
+        (one list of detections per image, inference stats for the claim)
+    """
+    if screen_cost is None:
+        screen_cost = getattr(screen_model, 'relative_cost', SCREEN_PASS_COST)
+    
+    # Hash each image once for all three models' cache lookups
+    keys = [image_key(image) for image in images] if cache is not None else [None] * len(images)
+    
+    screened_idx = list(range(len(images)))
+    if screen_model is not None:
+        _, screen_probs = _predict_arrays(screen_model, images, cache, keys, 'screen_model')
+        if screen_probs.shape[1]:
+            screened_idx = np.flatnonzero(screen_probs.max(axis=1) >= SCREEN_THRESHOLD).tolist()
+        else:
+            screened_idx = []
+    
+    screened_detections = detect_parts_and_damage_batch(
+        [images[idx] for idx in screened_idx],
+        part_model,
+        damage_model,
+        available_classes,
+        cache,
+        [keys[idx] for idx in screened_idx]
+    )
     
-    # Combine results
-    detections = []
-    for part_class, part_confidence in detected_parts:
-        detections.append({
-            'part': part_class,
-            'part_confidence': part_confidence,
-            'damage_types': detected_damages,
-            'action': action
-        })
+    all_detections = [[] for _ in images]
+    for idx, detections in zip(screened_idx, screened_detections):
+        all_detections[idx] = detections
+    
+    # The damage model ran exactly on the images with detections
+    # (a multi-head model has no separate damage pass: one forward serves both heads)
+    multi_head = shared_multi_head(part_model, damage_model) is not None
+    full_passes = (1 if multi_head else 2) * len(images)
+    screen_model_images = len(images) if screen_model is not None else 0
+    part_model_images = len(screened_idx)
+    damage_model_images = 0 if multi_head else sum(1 for detections in screened_detections if detections)
+    passes_saved = full_passes - (screen_model_images * screen_cost + part_model_images + damage_model_images)
+    
+    stats = {
+        'images': len(images),
+        'screen_model_images': screen_model_images,
+        'screen_pass_cost': screen_cost if screen_model is not None else None,
+        'screened_out': len(images) - len(screened_idx),
+        'part_model_images': part_model_images,
+        'damage_model_images': damage_model_images,
+        'model_passes_saved': passes_saved,
+        'compute_saved': f"{passes_saved / full_passes:.1%}" if full_passes else "0.0%"
+    }
     
-    return detections
+    return all_detections, stats
 
 
 def determine_action(damage_assessment: List[Tuple[str, float]]) -> str:
@@ -264,19 +467,20 @@ def consolidate_detections(all_detections: List[Dict]) -> List[Dict]:
 def find_matching_oem_parts(part_class: str, vehicle_parts_df: pd.DataFrame) -> pd.DataFrame:
     """
     Find OEM parts that match the ML-detected class
+    A make partition from get_available_parts_for_vehicle is answered from the
+    catalog's class index; any other parts frame is classified description by description
     """
-    search_terms = ML_CLASS_TO_OEM_PARTS.get(part_class, [])
-    
-    if not search_terms:
+    if part_class not in ML_CLASS_TO_OEM_PARTS:
         return pd.DataFrame()
     
-    # Search in part descriptions (case-insensitive)
-    mask = vehicle_parts_df['Part Description'].str.lower().str.contains(
-        '|'.join(search_terms),
-        case=False,
-        na=False,
-        regex=True
-    )
+    if not vehicle_parts_df.empty and 'Make' in vehicle_parts_df:
+        catalog = get_parts_catalog(ML_CLASS_TO_OEM_PARTS)
+        make = vehicle_parts_df['Make'].iloc[0]
+        if catalog.parts_for_make(make) is vehicle_parts_df:
+            return catalog.matching_parts(make, part_class)
+    
+    # Classify each unique description in one pass over all search terms
+    mask = PART_CLASSIFIER.mask(vehicle_parts_df['Part Description'], part_class)
     
     return vehicle_parts_df[mask]
 
@@ -284,26 +488,13 @@ def find_matching_oem_parts(part_class: str, vehicle_parts_df: pd.DataFrame) ->
 def get_labor_hours(part_class: str) -> Dict[str, float]:
     """
     Get labor hours for repair and replacement from labor_hours.csv
+    (table loaded once per process, reloaded when the file changes)
     """
-    labor_df = pd.read_csv('labor_hours.csv')
-    
     # Map ML class to labor hours part name
+    # (unmapped classes and unknown parts get the default hours)
     labor_part_name = ML_CLASS_TO_LABOR_PART.get(part_class)
     
-    if not labor_part_name:
-        # Default hours if mapping not found
-        return {'repair_hours': 2.0, 'replacement_hours': 3.0}
-    
-    # Find matching row
-    matching_row = labor_df[labor_df['Part'] == labor_part_name]
-    
-    if matching_row.empty:
-        return {'repair_hours': 2.0, 'replacement_hours': 3.0}
-    
-    return {
-        'repair_hours': float(matching_row['Repair_Hours'].iloc[0]),
-        'replacement_hours': float(matching_row['Replace_Hours'].iloc[0])
-    }
+    return get_labor_table().hours(labor_part_name)
 
 
 def calculate_part_cost(part_class: str, action: str, oem_parts_df: pd.DataFrame) -> Dict[str, Any]:
@@ -319,162 +510,220 @@ def calculate_part_cost(part_class: str, action: str, oem_parts_df: pd.DataFrame
     """
     labor_info = get_labor_hours(part_class)
     
-    if action == 'replace':
-        # Get OEM price
-        if oem_parts_df.empty:
-            oem_price = None
-            parts_cost = 0
-        else:
-            oem_price = oem_parts_df['Price'].mean()
-            parts_cost = oem_price
-        
-        labor_hours = labor_info['replacement_hours']
-        labor_cost = LABOR_RATE * labor_hours
-        subtotal = parts_cost + labor_cost
-        total_with_tax = subtotal * SALES_TAX
-        
-        return {
-            'action': 'Replace',
-            'oem_price': oem_price,
-            'labor_hours': labor_hours,
-            'labor_cost': labor_cost,
-            'subtotal': subtotal,
-            'total_with_tax': total_with_tax,
-            'has_oem_data': not oem_parts_df.empty
-        }
+    # Mean OEM price of the matching parts (NaN → labor only estimate)
+    oem_price = np.nan if oem_parts_df.empty else oem_parts_df['Price'].mean()
     
-    else:  # repair
-        labor_hours = labor_info['repair_hours']
-        labor_cost = LABOR_RATE * labor_hours
-        total_with_tax = labor_cost * SALES_TAX
-        
-        return {
-            'action': 'Repair',
-            'oem_price': None,
-            'labor_hours': labor_hours,
-            'labor_cost': labor_cost,
-            'subtotal': labor_cost,
-            'total_with_tax': total_with_tax,
-            'has_oem_data': True  # Not needed for repair
-        }
+    costs = compute_costs(
+        [action], [oem_price],
+        [labor_info['repair_hours']], [labor_info['replacement_hours']],
+        LABOR_RATE, SALES_TAX
+    )
+    
+    return cost_row(costs, 0)
+
+
+def calculate_costs(part_classes: List[str], actions: List[str], make: str) -> Dict[str, np.ndarray]:
+    """
+    Calculate costs for all consolidated parts in one vectorized pass
+    
+    OEM prices come from the catalog's precomputed (make, class) price stats,
+    labor hours from the labor table. Returns the cost_engine arrays
+    aligned to part_classes.
+    """
+    catalog = get_parts_catalog(ML_CLASS_TO_OEM_PARTS)
+    
+    oem_prices = []
+    for part_class in part_classes:
+        stats = catalog.price_stats(make, part_class)
+        oem_prices.append(stats['mean'] if stats else np.nan)
+    
+    repair_hours, replacement_hours = get_labor_table().hours_arrays(
+        [ML_CLASS_TO_LABOR_PART.get(part_class) for part_class in part_classes]
+    )
+    
+    return compute_costs(actions, oem_prices, repair_hours, replacement_hours, LABOR_RATE, SALES_TAX)
+
+
+def build_repair_item(detection: Dict, cost_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Format one consolidated detection and its costs for the estimate
+    """
+    action = detection['action']
+    
+    repair_item = {
+        'part': detection['part'],
+        'action': cost_info['action'],
+        'damage_detected': [d for d, c in detection['damage_types']],
+        'confidence': f"{detection['part_confidence']:.1%}",
+        'labor_hours': cost_info['labor_hours'],
+        'labor_cost': f"${cost_info['labor_cost']:.2f}",
+    }
+    
+    if cost_info['oem_price'] is not None:
+        repair_item['oem_part_price'] = f"${cost_info['oem_price']:.2f}"
+        repair_item['subtotal'] = f"${cost_info['subtotal']:.2f}"
+    else:
+        repair_item['oem_part_price'] = 'N/A' if action == 'repair' else 'Data unavailable'
+        repair_item['subtotal'] = f"${cost_info['subtotal']:.2f}"
+    
+    repair_item['total_with_tax'] = f"${cost_info['total_with_tax']:.2f}"
+    
+    if not cost_info['has_oem_data'] and action == 'replace':
+        repair_item['note'] = 'OEM price not available - labor only estimate'
+    
+    return repair_item
 
 
 # ============================================================
 # MAIN PIPELINE
 # ============================================================
 
-def estimate_repair_cost(vin: str, images: List, part_model, damage_model) -> Dict[str, Any]:
+def estimate_repair_cost(vin: str, images: List, part_model, damage_model,
+                         cascade: bool = False, screen_model=None, cache=None,
+                         preprocess: bool = False, timings: bool = False) -> Dict[str, Any]:
     """
     Complete pipeline: VIN → Vehicle → Parts → Damage → Cost
     
     Args:
-        vin: 17-character VIN string
+        vin: 17-character VIN string (case and surrounding spaces are ignored)
         images: List of images (numpy arrays or PIL Images)
         part_model: Trained part identification model
         damage_model: Trained damage classification model
+        cascade: Use cascaded inference and report the compute saved ('inference')
+        screen_model: Optional cheap screening model for cascade mode
+                      (its 'relative_cost' attribute, the cost of one pass relative
+                      to a full model, weights it in the compute-saved stats)
+        cache: Optional PredictionCache (resubmitted images skip inference)
+        preprocess: Decode + resize all images in parallel into one float32 batch
+                    first (images may then also be encoded bytes or file paths)
+        timings: Add per-stage and per-model timings to the result ('timings')
     
     Returns:
         Complete repair estimate with breakdown
+    
+    Stages are timed whenever timings is set or a metrics sink is installed
+    (pipeline_metrics.set_metrics_sink); otherwise timing costs nothing.
     """
-    # STEP 1: Decode VIN
-    vehicle_info = decode_vin_from_dataset(vin)
-    if not vehicle_info:
-        return {"error": "VIN not found in database"}
+    with timed_estimate(timings or get_metrics_sink() is not None) as timer:
+        result = _estimate_repair_cost(vin, images, part_model, damage_model,
+                                       cascade, screen_model, cache, preprocess)
+    
+    if timings:
+        result['timings'] = timer.as_dict()
+    
+    return result
+
+
+def _estimate_repair_cost(vin: str, images: List, part_model, damage_model,
+                          cascade: bool, screen_model, cache, preprocess: bool) -> Dict[str, Any]:
+    # STEP 1: Decode VIN (reject malformed VINs before any lookup)
+    with stage('vin_decode'):
+        vin = normalize_vin(vin)
+        vin_error = validate_vin(vin)
+        if vin_error:
+            return {"error": f"Invalid VIN: {vin_error['message']}", "vin_validation": vin_error}
+        
+        vehicle_info = decode_vin_from_dataset(vin)
+        if not vehicle_info:
+            return {"error": "VIN not found in database"}
     
     # STEP 2: Get available parts for this vehicle
-    available_classes, vehicle_parts_df = get_available_parts_for_vehicle(vehicle_info)
+    with stage('part_filtering'):
+        available_classes, vehicle_parts_df = get_available_parts_for_vehicle(vehicle_info)
     
     if not available_classes:
         return {"error": f"No OEM parts data for {vehicle_info['make']}"}
     
-    # STEP 3: Process each image
-    all_detections = []
+    # STEP 3: Process all images (one batched call per model)
+    if preprocess:
+        with stage('preprocess'):
+            images = preprocess_images(images)
     
-    for idx, image in enumerate(images):
-        detections = detect_parts_and_damage(
-            image, 
-            part_model, 
-            damage_model, 
-            available_classes
-        )
+    all_detections = []
+    inference_stats = None
+    
+    with stage('detection'):
+        if cascade:
+            per_image_detections, inference_stats = detect_parts_and_damage_cascade(
+                images,
+                part_model,
+                damage_model,
+                available_classes,
+                screen_model,
+                cache
+            )
+        else:
+            per_image_detections = detect_parts_and_damage_batch(
+                images,
+                part_model,
+                damage_model,
+                available_classes,
+                cache
+            )
+    
+    with stage('consolidation'):
+        for idx, detections in enumerate(per_image_detections):
+            # Add image index to each detection
+            for detection in detections:
+                detection['image_idx'] = idx
+            
+            all_detections.extend(detections)
         
-        # Add image index to each detection
-        for detection in detections:
-            detection['image_idx'] = idx
+        if not all_detections:
+            result = {
+                "vehicle": vehicle_info,
+                "message": "No damaged parts detected in images"
+            }
+            if inference_stats is not None:
+                result['inference'] = inference_stats
+            return result
         
-        all_detections.extend(detections)
-    
-    if not all_detections:
-        return {
-            "vehicle": vehicle_info,
-            "message": "No damaged parts detected in images"
-        }
-    
-    # STEP 4: Consolidate detections across images
-    consolidated_parts = consolidate_detections(all_detections)
-    
-    # STEP 5: Calculate costs
-    repair_estimate = []
-    total_cost = 0
+        # STEP 4: Consolidate detections across images
+        consolidated_parts = consolidate_detections(all_detections)
+    
+    # STEP 5: Calculate costs (all parts in one batch)
+    with stage('costing'):
+        costs = calculate_costs(
+            [detection['part'] for detection in consolidated_parts],
+            [detection['action'] for detection in consolidated_parts],
+            vehicle_info['make']
+        )
     
-    for detection in consolidated_parts:
-        part_class = detection['part']
-        action = detection['action']
-        
-        # Find matching OEM parts
-        matching_parts = find_matching_oem_parts(part_class, vehicle_parts_df)
-        
-        # Calculate cost
-        cost_info = calculate_part_cost(part_class, action, matching_parts)
+    # STEP 6: Return complete estimate
+    with stage('response_build'):
+        repair_estimate = [
+            build_repair_item(detection, cost_row(costs, i))
+            for i, detection in enumerate(consolidated_parts)
+        ]
+        total_cost = float(costs['total_with_tax'].sum())
         
-        # Build repair item
-        repair_item = {
-            'part': part_class,
-            'action': cost_info['action'],
-            'damage_detected': [d for d, c in detection['damage_types']],
-            'confidence': f"{detection['part_confidence']:.1%}",
-            'labor_hours': cost_info['labor_hours'],
-            'labor_cost': f"${cost_info['labor_cost']:.2f}",
+        estimate = {
+            'vehicle': {
+                'vin': vin,
+                'year': vehicle_info['year'],
+                'make': vehicle_info['make'],
+                'model': vehicle_info['model']
+            },
+            'repair_items': repair_estimate,
+            'summary': {
+                'total_parts': len(consolidated_parts),
+                'parts_to_replace': len([r for r in repair_estimate if r['action'] == 'Replace']),
+                'parts_to_repair': len([r for r in repair_estimate if r['action'] == 'Repair']),
+                'total_estimate': f"${total_cost:.2f}"
+            },
+            'notes': [
+                'Estimate includes 6% sales tax',
+                'Labor rate: $55/hour',
+                'Based on OEM parts pricing where available',
+                'Actual costs may vary based on shop rates and part availability',
+                'Multiple images processed and consolidated'
+            ]
         }
         
-        if cost_info['oem_price'] is not None:
-            repair_item['oem_part_price'] = f"${cost_info['oem_price']:.2f}"
-            repair_item['subtotal'] = f"${cost_info['subtotal']:.2f}"
-        else:
-            repair_item['oem_part_price'] = 'N/A' if action == 'repair' else 'Data unavailable'
-            repair_item['subtotal'] = f"${cost_info['subtotal']:.2f}"
-        
-        repair_item['total_with_tax'] = f"${cost_info['total_with_tax']:.2f}"
-        
-        if not cost_info['has_oem_data'] and action == 'replace':
-            repair_item['note'] = 'OEM price not available - labor only estimate'
-        
-        repair_estimate.append(repair_item)
-        total_cost += cost_info['total_with_tax']
+        if inference_stats is not None:
+            estimate['inference'] = inference_stats
     
-    # STEP 6: Return complete estimate
-    return {
-        'vehicle': {
-            'vin': vin,
-            'year': vehicle_info['year'],
-            'make': vehicle_info['make'],
-            'model': vehicle_info['model']
-        },
-        'repair_items': repair_estimate,
-        'summary': {
-            'total_parts': len(consolidated_parts),
-            'parts_to_replace': len([r for r in repair_estimate if r['action'] == 'Replace']),
-            'parts_to_repair': len([r for r in repair_estimate if r['action'] == 'Repair']),
-            'total_estimate': f"${total_cost:.2f}"
-        },
-        'notes': [
-            'Estimate includes 6% sales tax',
-            'Labor rate: $55/hour',
-            'Based on OEM parts pricing where available',
-            'Actual costs may vary based on shop rates and part availability',
-            'Multiple images processed and consolidated'
-        ]
-    }
+    return estimate
 
 
 # ============================================================
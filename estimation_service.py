@@ -0,0 +1,375 @@
+"""
+Estimation Service
+asyncio HTTP server around estimate_repair_cost with request micro-batching
+
+Each request runs the (synchronous) pipeline in a worker thread. The part
+and damage models are wrapped in BatchedModel proxies: their predict_array
+calls from all concurrent requests are queued into one MicroBatcher per
+model, which runs a single batch once max_batch_size images are waiting or
+the oldest has waited max_wait_ms, then fans the rows back out per request.
+The two heads of a MultiHeadModelAdapter share one MultiHeadBatcher over
+its forward pass, so each image still runs the backbone once.
+
+Endpoints:
+    POST /estimate   {"vin": "...", "images": ["<base64 JPEG/PNG>", ...]}
+    GET  /health
+    GET  /metrics    stage / model latency histograms (pipeline_metrics sink)
+
+Usage:
+    python estimation_service.py --port 8080 --backend tflite
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from cost_estimation_pipeline import estimate_repair_cost
+from model_adapters import MultiHeadModelAdapter, predict_arrays, shared_multi_head
+from pipeline_metrics import HistogramSink, get_metrics_sink, set_metrics_sink
+from worker_pool import preload_shared_data
+
+MAX_BATCH_SIZE = 32
+MAX_WAIT_MS = 10
+REQUEST_WORKERS = 16          # Concurrent pipeline runs (threads)
+MAX_BODY_BYTES = 64 * 2**20   # 64 MB of base64 images per request
+
+
+class MicroBatcher:
+    """
+    Merges concurrent predict requests for one model into shared batches
+    The model always runs on the batcher's own thread, one batch at a time
+    """
+
+    def __init__(self, model, max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self.classes = list(getattr(model, 'classes', []))  # As last reported by predict_arrays
+
+        self._queue = None
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='batcher')
+        self.batches = 0
+        self.images = 0
+
+    def set_model(self, model):
+        """Run model from the next batch on"""
+        self.model = model
+        self.classes = list(getattr(model, 'classes', []))
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+
+    async def predict(self, images: Sequence) -> Tuple[List[str], List]:
+        """(classes, one output row per image), computed as part of shared batches"""
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in images]
+        for image, future in zip(images, futures):
+            self._queue.put_nowait((image, future))
+        results = await asyncio.gather(*futures)
+        classes = results[-1][0] if results else self.classes
+        return classes, [row for _, row in results]
+
+    def _infer(self, images: List) -> Tuple[List[str], Sequence]:
+        """(classes, rows) for one batch, on the batcher thread"""
+        classes, probabilities = predict_arrays(self.model, images)
+        return list(classes), probabilities
+
+    async def _collect(self) -> List[Tuple]:
+        """Wait for one item, then fill the batch until it is full or the deadline passes"""
+        pending = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(pending) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return pending
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = await self._collect()
+            images = [image for image, _ in pending]
+
+            try:
+                classes, rows = await loop.run_in_executor(self._executor, self._infer, images)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.classes = classes
+            self.batches += 1
+            self.images += len(images)
+            for (_, future), row in zip(pending, rows):
+                if not future.done():
+                    future.set_result((classes, row))
+
+
+class MultiHeadBatcher(MicroBatcher):
+    """MicroBatcher over MultiHeadModelAdapter.forward: each row is {head: probabilities}"""
+
+    def _infer(self, images: List) -> Tuple[List[str], Sequence]:
+        outputs = self.model.forward(images)
+        return list(outputs), [{head: probs[i] for head, probs in outputs.items()} for i in range(len(images))]
+
+
+class BatchedModel:
+    """
+    Synchronous model proxy for pipeline threads: predict_array goes through a MicroBatcher
+    Keeps the wrapped model's version (prediction cache keys stay valid); classes are the
+    ones predict_arrays reported for the batch, so dict-returning models work too
+    """
+
+    def __init__(self, batcher: MicroBatcher, loop: asyncio.AbstractEventLoop):
+        self._batcher = batcher
+        self._loop = loop
+        self.classes = list(batcher.classes)
+        self.version = getattr(batcher.model, 'version', None)
+
+    def predict_array(self, images: Sequence) -> np.ndarray:
+        if not len(images):
+            return np.empty((0, len(self.classes)), dtype=np.float32)
+        classes, rows = asyncio.run_coroutine_threadsafe(self._batcher.predict(images), self._loop).result()
+        self.classes = classes
+        return np.stack(rows)
+
+    def predict_batch(self, images: Sequence):
+        return [
+            {cls: float(p) for cls, p in zip(self.classes, row)}
+            for row in self.predict_array(images)
+        ]
+
+    def predict(self, image):
+        return self.predict_batch([image])[0]
+
+
+class BatchedMultiHead(MultiHeadModelAdapter):
+    """
+    MultiHeadModelAdapter proxy for pipeline threads: forward goes through a MultiHeadBatcher
+    Its heads are recognised by shared_multi_head, so the pipeline takes both from one pass
+    """
+
+    def __init__(self, batcher: MultiHeadBatcher, loop: asyncio.AbstractEventLoop):
+        adapter = batcher.model
+        super().__init__(None, adapter.part_head.classes, adapter.damage_head.classes,
+                         adapter.img_size, adapter.version)
+        self._batcher = batcher
+        self._loop = loop
+
+    def forward(self, images: Sequence) -> Dict[str, np.ndarray]:
+        if not len(images):
+            return super().forward(images)
+        _, rows = asyncio.run_coroutine_threadsafe(self._batcher.predict(images), self._loop).result()
+        return {head: np.stack([row[head] for row in rows]) for head in ('parts', 'damage')}
+
+    def head_outputs(self, head: str, images: Sequence) -> List[np.ndarray]:
+        return list(self.forward(images)[head])
+
+
+class EstimationService:
+    """Runs estimates for concurrent requests with shared micro-batched inference"""
+
+    def __init__(self, part_model, damage_model, max_batch_size: int = MAX_BATCH_SIZE,
+                 max_wait_ms: float = MAX_WAIT_MS, workers: int = REQUEST_WORKERS, cache=None):
+        multi_head = shared_multi_head(part_model, damage_model)
+        if multi_head is not None:
+            self.batchers = {'multi_head_model': MultiHeadBatcher(multi_head, max_batch_size, max_wait_ms)}
+        else:
+            self.batchers = {
+                'part_model': MicroBatcher(part_model, max_batch_size, max_wait_ms),
+                'damage_model': MicroBatcher(damage_model, max_batch_size, max_wait_ms),
+            }
+        self.cache = cache
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='estimate')
+        self._loop = None
+        self._models = None  # (part_model, damage_model) proxies, replaced as a pair on swap
+
+    async def start(self):
+        if get_metrics_sink() is None:
+            set_metrics_sink(HistogramSink())
+
+        self._loop = asyncio.get_running_loop()
+        # Load the lookup tables before serving, instead of inside the first requests
+        await self._loop.run_in_executor(self._executor, preload_shared_data)
+
+        for batcher in self.batchers.values():
+            batcher.start()
+        self._models = self._proxies()
+
+    def _proxies(self) -> Tuple:
+        """(part_model, damage_model) for pipeline threads, over the current batchers"""
+        if 'multi_head_model' in self.batchers:
+            proxy = BatchedMultiHead(self.batchers['multi_head_model'], self._loop)
+            return proxy.part_head, proxy.damage_head
+        return BatchedModel(self.batchers['part_model'], self._loop), BatchedModel(self.batchers['damage_model'], self._loop)
+
+    def swap_models(self, part_model, damage_model):
+        """
+        Serve new (already loaded and warmed) models without restarting: the batchers
+        run them from their next batch on. Requests in flight may finish on the new models.
+        Switching between a multi-head model and separate models needs a restart.
+        """
+        multi_head = shared_multi_head(part_model, damage_model)
+        if (multi_head is not None) != ('multi_head_model' in self.batchers):
+            raise ValueError("Can't swap between a multi-head model and separate models; restart the service")
+
+        if multi_head is not None:
+            self.batchers['multi_head_model'].set_model(multi_head)
+        else:
+            self.batchers['part_model'].set_model(part_model)
+            self.batchers['damage_model'].set_model(damage_model)
+
+        # New proxies: their classes, version and prediction cache namespace follow the new models
+        if self._loop is not None:
+            self._models = self._proxies()
+
+    async def activate(self, registry, model_dir: str = None, part: str = 'part', damage: str = 'damage'):
+        """ModelRegistry.activate(model_dir) off the event loop (load + warm), then swap_models to it"""
+        def load():
+            registry.activate(model_dir)
+            return registry.pipeline_models(part, damage)
+
+        self.swap_models(*await self._loop.run_in_executor(self._executor, load))
+
+    async def stop(self):
+        for batcher in self.batchers.values():
+            await batcher.stop()
+        self._executor.shutdown(wait=False)
+
+    async def estimate(self, vin: str, images: List, **options):
+        """
+        estimate_repair_cost on a worker thread, models shared through the batchers
+        images: encoded JPEG/PNG bytes (decoded in parallel by the pipeline) or decoded images
+        options: extra estimate_repair_cost keyword arguments (e.g. cascade=True)
+        """
+        loop = asyncio.get_running_loop()
+        part_model, damage_model = self._models
+        return await loop.run_in_executor(
+            self._executor,
+            lambda: estimate_repair_cost(vin, images, part_model, damage_model,
+                                         cache=self.cache, preprocess=True, **options)
+        )
+
+    def stats(self):
+        return {
+            name: {
+                'batches': batcher.batches,
+                'images': batcher.images,
+                'mean_batch_size': batcher.images / batcher.batches if batcher.batches else 0.0
+            }
+            for name, batcher in self.batchers.items()
+        }
+
+    # ============================================================
+    # HTTP
+    # ============================================================
+
+    async def handle_estimate(self, body: bytes):
+        try:
+            request = json.loads(body)
+            vin = request['vin']
+            images = [base64.b64decode(data) for data in request.get('images', [])]
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {'error': f'Bad request: {e}'}
+
+        if not images:
+            return 400, {'error': 'Bad request: no images'}
+
+        from PIL import UnidentifiedImageError
+
+        try:
+            return 200, await self.estimate(vin, images)
+        except UnidentifiedImageError as e:
+            return 400, {'error': f'Bad request: {e}'}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            if len(request_line) < 2:
+                status, payload = 400, {'error': 'Bad request'}
+            elif request_line[:2] == ['GET', '/health']:
+                status, payload = 200, {'status': 'ok', 'batching': self.stats()}
+            elif request_line[:2] == ['GET', '/metrics']:
+                sink = get_metrics_sink()
+                status, payload = 200, sink.summary() if hasattr(sink, 'summary') else {}
+            elif request_line[:2] == ['POST', '/estimate']:
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload = 413, {'error': 'Request too large'}
+                else:
+                    status, payload = await self.handle_estimate(await reader.readexactly(length))
+            else:
+                status, payload = 404, {'error': 'Not found'}
+        except Exception as e:
+            status, payload = 500, {'error': str(e)}
+
+        body = json.dumps(payload, default=str).encode()
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large'}.get(status, 'Error')
+        writer.write(
+            f'HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8080):
+        await self.start()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"✓ Estimation service listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+
+
+if __name__ == "__main__":
+    from model_registry import get_model_registry
+
+    parser = argparse.ArgumentParser(description='Repair cost estimation HTTP service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--backend', default='keras', choices=['keras', 'tflite'])
+    parser.add_argument('--part-model', default='part')
+    parser.add_argument('--damage-model', default='damage')
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS)
+    parser.add_argument('--workers', type=int, default=REQUEST_WORKERS)
+    args = parser.parse_args()
+
+    part_model, damage_model = get_model_registry(args.backend).pipeline_models(args.part_model, args.damage_model)
+
+    service = EstimationService(part_model, damage_model, args.max_batch_size, args.max_wait_ms, args.workers)
+    asyncio.run(service.serve(args.host, args.port))
@@ -0,0 +1,92 @@
+"""
+Export Trained Models to TFLite
+Converts the .keras models saved by the training scripts into .tflite files
+plus a labels JSON, so serving can use model_adapters.load_tflite_adapter
+with the standalone TFLite interpreter instead of importing TensorFlow
+
+Usage:
+    python export_models.py                 # every trained model found in models/
+    python export_models.py part damage     # selected models
+"""
+
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TF warnings
+
+import json
+import pickle
+import sys
+from pathlib import Path
+
+MODEL_DIR = Path('models')
+
+# name → (saved Keras model, label encoder(s) from training)
+EXPORTS = {
+    'part': ('part_identification_model_final.keras', 'part_mlb.pkl'),
+    'damage': ('damage_classification_model_final.keras', 'damage_mlb.pkl'),
+    'multitask': ('multitask_model_final.keras', {
+        'parts': 'multitask_part_mlb.pkl',
+        'damage': 'multitask_damage_mlb.pkl',
+    }),
+}
+
+
+def tflite_paths(name: str):
+    """(model path, labels path) of an exported model"""
+    return MODEL_DIR / f'{name}_model.tflite', MODEL_DIR / f'{name}_model.labels.json'
+
+
+def load_classes(mlb_file: str):
+    """Class names from a pickled MultiLabelBinarizer"""
+    with open(MODEL_DIR / mlb_file, 'rb') as f:
+        return [str(c) for c in pickle.load(f).classes_]
+
+
+def export_model(name: str):
+    """Convert one Keras model to TFLite and write its labels"""
+    import tensorflow as tf
+    from tensorflow import keras
+
+    model_file, mlb_files = EXPORTS[name]
+    tflite_path, labels_path = tflite_paths(name)
+
+    print(f"\n[{name}] Loading {MODEL_DIR / model_file}...")
+    model = keras.models.load_model(MODEL_DIR / model_file)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    tflite_model = converter.convert()
+
+    with open(tflite_path, 'wb') as f:
+        f.write(tflite_model)
+    print(f"  ✓ Saved {tflite_path} ({len(tflite_model) / 1e6:.1f} MB)")
+
+    if isinstance(mlb_files, dict):
+        labels = {head: load_classes(mlb_file) for head, mlb_file in mlb_files.items()}
+    else:
+        labels = load_classes(mlb_files)
+
+    with open(labels_path, 'w') as f:
+        json.dump(labels, f, indent=2)
+    print(f"  ✓ Saved {labels_path}")
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or [
+        name for name, (model_file, _) in EXPORTS.items()
+        if (MODEL_DIR / model_file).exists()
+    ]
+
+    if not names:
+        sys.exit(f"No trained models found in {MODEL_DIR}/")
+
+    unknown = [name for name in names if name not in EXPORTS]
+    if unknown:
+        sys.exit(f"Unknown model(s): {', '.join(unknown)} (choose from {', '.join(EXPORTS)})")
+
+    print("="*70)
+    print("EXPORTING MODELS TO TFLITE")
+    print("="*70)
+
+    for name in names:
+        export_model(name)
+
+    print("\n✓ Export complete")
@@ -0,0 +1,113 @@
+"""
+Image Preprocessing
+Decodes and resizes a claim's uploads concurrently into one contiguous
+(N, 224, 224, 3) float32 batch ready for the models
+
+- Bounded thread pool shared by all requests in the process
+  (PIL releases the GIL while decoding and resizing)
+- JPEG draft mode: the decoder downscales by 1/2, 1/4 or 1/8 while
+  decoding, so a 4000×3000 photo is never fully decoded for a 224×224 input
+"""
+
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from model_adapters import IMG_SIZE, preprocess_image
+
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def open_image(source, img_size=IMG_SIZE):
+    """
+    Encoded image (bytes, file path or file object) → PIL Image,
+    JPEGs decoded at the smallest draft scale that still covers img_size
+    PIL Images and numpy arrays are returned as is
+    """
+    from PIL import Image
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif not isinstance(source, (str, Path)) and not hasattr(source, 'read'):
+        return source  # Already decoded
+
+    image = Image.open(source)
+    image.draft('RGB', (img_size[1], img_size[0]))  # No-op for non-JPEG formats
+    return image
+
+
+def load_image(source, img_size=IMG_SIZE) -> np.ndarray:
+    """Any supported source → float32 (*img_size, 3) array in [0, 1]"""
+    return preprocess_image(open_image(source, img_size), img_size)
+
+
+class ImagePreprocessor:
+    """Concurrent decode + resize of a claim's images into one float32 batch"""
+
+    def __init__(self, max_workers: int = MAX_WORKERS, img_size=IMG_SIZE):
+        self.img_size = img_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='preprocess')
+
+    def __call__(self, sources: Sequence) -> np.ndarray:
+        batch = np.empty((len(sources), *self.img_size, 3), dtype=np.float32)
+
+        def fill(i):
+            batch[i] = load_image(sources[i], self.img_size)
+
+        if len(sources) == 1:
+            fill(0)
+        else:
+            # list() re-raises the first decode error in the caller
+            list(self._executor.map(fill, range(len(sources))))
+        return batch
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+# ============================================================
+# SHARED INSTANCE
+# ============================================================
+
+_preprocessor = None
+_preprocessor_lock = threading.Lock()
+
+
+def get_image_preprocessor() -> ImagePreprocessor:
+    """Return the process-wide preprocessor (one bounded pool for all requests)"""
+    global _preprocessor
+    if _preprocessor is None:
+        with _preprocessor_lock:
+            if _preprocessor is None:
+                _preprocessor = ImagePreprocessor()
+    return _preprocessor
+
+
+def configure_image_preprocessor(max_workers: int) -> ImagePreprocessor:
+    """Replace the process-wide preprocessor with one of a different pool size"""
+    global _preprocessor
+    with _preprocessor_lock:
+        previous, _preprocessor = _preprocessor, ImagePreprocessor(max_workers)
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return _preprocessor
+
+
+def reset_after_fork():
+    """
+    Forget the preprocessor inherited from the parent process (call first thing in a forked child)
+    Its pool threads don't exist in the child, so it is dropped without a shutdown
+    """
+    global _preprocessor, _preprocessor_lock
+    _preprocessor_lock = threading.Lock()
+    _preprocessor = None
+
+
+def preprocess_images(sources: Sequence) -> np.ndarray:
+    """(N, 224, 224, 3) float32 batch for a claim's images, decoded in parallel"""
+    return get_image_preprocessor()(sources)
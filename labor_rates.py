@@ -0,0 +1,73 @@
+"""
+Labor Rates
+labor_hours.csv loaded once into a dict keyed by part name
+Hot-reloads when the file's mtime changes
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+LABOR_HOURS_PATH = 'labor_hours.csv'
+
+# Used when a part has no row in the labor table
+DEFAULT_REPAIR_HOURS = 2.0
+DEFAULT_REPLACEMENT_HOURS = 3.0
+
+
+class LaborTable:
+    """Repair/replacement hours per labor part name (first row wins on duplicates)"""
+
+    def __init__(self, labor_df: pd.DataFrame):
+        labor_df = labor_df.drop_duplicates('Part', keep='first')
+        self._hours = {
+            part: (float(repair), float(replace))
+            for part, repair, replace in zip(
+                labor_df['Part'], labor_df['Repair_Hours'], labor_df['Replace_Hours']
+            )
+        }
+
+    @classmethod
+    def from_csv(cls, path: str = LABOR_HOURS_PATH) -> 'LaborTable':
+        return cls(pd.read_csv(path))
+
+    def __len__(self) -> int:
+        return len(self._hours)
+
+    def __contains__(self, part: str) -> bool:
+        return part in self._hours
+
+    def hours(self, part: Optional[str]) -> Dict[str, float]:
+        """Labor hours for a labor part name, defaults if the part is unknown"""
+        repair, replace = self._hours.get(part, (DEFAULT_REPAIR_HOURS, DEFAULT_REPLACEMENT_HOURS))
+        return {'repair_hours': repair, 'replacement_hours': replace}
+
+    def hours_arrays(self, parts: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """(repair_hours, replacement_hours) arrays aligned to parts, defaults for unknown parts"""
+        default = (DEFAULT_REPAIR_HOURS, DEFAULT_REPLACEMENT_HOURS)
+        hours = np.array([self._hours.get(part, default) for part in parts], dtype=np.float64).reshape(-1, 2)
+        return hours[:, 0], hours[:, 1]
+
+
+# ============================================================
+# SHARED INSTANCE
+# ============================================================
+
+_labor_table = None
+_labor_table_mtime = None
+_labor_table_lock = threading.Lock()
+
+
+def get_labor_table() -> LaborTable:
+    """Return the process-wide labor table, reloading it if labor_hours.csv changed"""
+    global _labor_table, _labor_table_mtime
+    mtime = os.path.getmtime(LABOR_HOURS_PATH)
+    if _labor_table is None or mtime != _labor_table_mtime:
+        with _labor_table_lock:
+            if _labor_table is None or mtime != _labor_table_mtime:
+                _labor_table = LaborTable.from_csv(LABOR_HOURS_PATH)
+                _labor_table_mtime = mtime
+    return _labor_table
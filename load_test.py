@@ -0,0 +1,293 @@
+"""
+Load Test / Replay Harness
+Replays recorded estimate requests against estimate_repair_cost (or the
+micro-batching EstimationService) at a configurable concurrency and rate,
+with stub models of configurable latency, so it runs offline
+
+Request file: JSON lines, one recorded request per line
+    {"vin": "1HGBH41JXMN109186", "images": ["damage_1.jpg", "data:image/jpeg;base64,<...>", {"b64": "<...>"}]}
+    {"vin": "1HGBH41JXMN109186", "num_images": 6}     # synthetic 224×224 images
+Images are file paths (relative to the request file), data: URIs, or
+{"b64": ...} objects; a bare string that is not an existing file is
+decoded as base64.
+Lines without a "vin" are skipped.
+
+Report: throughput, latency percentiles (end-to-end, including queueing),
+errors, and the per-stage / per-model breakdown from pipeline_metrics.
+
+Usage:
+    python load_test.py requests.jsonl --concurrency 8 --rate 20 --repeat 5
+    python load_test.py requests.jsonl --target service --max-batch-size 32 --output report.json
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from cost_estimation_pipeline import DAMAGE_ACTION_MAP, ML_CLASS_TO_OEM_PARTS, estimate_repair_cost
+from model_adapters import IMG_SIZE
+from pipeline_metrics import HistogramSink, set_metrics_sink
+
+TARGET_PIPELINE = 'pipeline'
+TARGET_SERVICE = 'service'
+
+
+class StubModel:
+    """
+    Offline stand-in for a trained model: array-native adapter whose
+    predict_array sleeps latency_ms + per_image_ms × N (like native inference,
+    without holding the GIL) and returns deterministic probabilities per image
+    """
+
+    def __init__(self, classes: Sequence[str], latency_ms: float = 20.0, per_image_ms: float = 5.0,
+                 name: str = 'stub'):
+        self.classes = list(classes)
+        self.latency_ms = latency_ms
+        self.per_image_ms = per_image_ms
+        self.version = f'{name}-stub'
+        self._lock = threading.Lock()  # One inference at a time, like a single model instance
+
+    def predict_array(self, images: Sequence) -> np.ndarray:
+        with self._lock:
+            time.sleep((self.latency_ms + self.per_image_ms * len(images)) / 1000)
+
+        probabilities = np.empty((len(images), len(self.classes)), dtype=np.float32)
+        for i, image in enumerate(images):
+            seed = zlib.crc32(np.ascontiguousarray(image)[::16, ::16].tobytes())
+            probabilities[i] = np.random.default_rng(seed).random(len(self.classes))
+        return probabilities
+
+
+def stub_models(latency_ms: float, per_image_ms: float):
+    """(part_model, damage_model) stubs over the pipeline's class names"""
+    return (
+        StubModel(list(ML_CLASS_TO_OEM_PARTS), latency_ms, per_image_ms, 'part'),
+        StubModel(list(DAMAGE_ACTION_MAP), latency_ms, per_image_ms, 'damage'),
+    )
+
+
+def synthetic_images(count: int, seed: int) -> List[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (*IMG_SIZE, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def load_image_source(value, base_dir: Path) -> bytes:
+    """Encoded image bytes from a path (relative to the request file), data: URI, or {"b64": ...}"""
+    if isinstance(value, dict):
+        return base64.b64decode(value['b64'])
+    if value.startswith('data:'):
+        return base64.b64decode(value.partition(',')[2])
+
+    try:
+        path = base_dir / value
+        if path.is_file():
+            return path.read_bytes()
+    except OSError:  # Not a usable path (e.g. a base64 string longer than NAME_MAX)
+        pass
+    return base64.b64decode(value)
+
+
+def load_requests(path: str) -> List[Dict[str, Any]]:
+    """Recorded requests with their images loaded into memory (so replay doesn't time disk reads)"""
+    base_dir = Path(path).parent
+    requests, skipped = [], 0
+
+    with open(path, 'r') as f:
+        for line_no, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict) or 'vin' not in record:
+                skipped += 1
+                continue
+
+            if 'images' in record:
+                images = [load_image_source(value, base_dir) for value in record['images']]
+            else:
+                images = synthetic_images(int(record.get('num_images', 4)), seed=line_no)
+            requests.append({'vin': record['vin'], 'images': images})
+
+    if skipped:
+        print(f"  ⚠ Skipped {skipped} line(s) without a 'vin'")
+    return requests
+
+
+# ============================================================
+# RUNNERS
+# ============================================================
+
+def _schedule(count: int, rate: Optional[float]) -> List[float]:
+    """Open-loop send offsets (seconds from start); all at once if rate is None"""
+    if not rate:
+        return [0.0] * count
+    return [i / rate for i in range(count)]
+
+
+def run_pipeline(requests: List[Dict], part_model, damage_model, concurrency: int,
+                 rate: Optional[float], options: Dict[str, Any]) -> List[Dict]:
+    """Call estimate_repair_cost directly from concurrency threads"""
+    offsets = _schedule(len(requests), rate)
+    start = time.perf_counter()
+
+    def run(i):
+        delay = start + offsets[i] - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        sent = time.perf_counter()
+        try:
+            result = estimate_repair_cost(requests[i]['vin'], requests[i]['images'],
+                                          part_model, damage_model, preprocess=True, **options)
+            error = result.get('error')
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+        return {'latency_ms': (time.perf_counter() - sent) * 1000, 'error': error,
+                'images': len(requests[i]['images'])}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(run, range(len(requests))))
+
+
+def run_service(requests: List[Dict], part_model, damage_model, concurrency: int,
+                rate: Optional[float], max_batch_size: int, max_wait_ms: float,
+                options: Dict[str, Any]) -> List[Dict]:
+    """Send requests through an in-process EstimationService (micro-batched inference)"""
+    from estimation_service import EstimationService
+
+    async def main():
+        service = EstimationService(part_model, damage_model, max_batch_size, max_wait_ms, workers=concurrency)
+        await service.start()
+        semaphore = asyncio.Semaphore(concurrency)
+        offsets = _schedule(len(requests), rate)
+        start = time.perf_counter()
+
+        async def run(i):
+            delay = start + offsets[i] - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with semaphore:
+                sent = time.perf_counter()
+                try:
+                    result = await service.estimate(requests[i]['vin'], requests[i]['images'], **options)
+                    error = result.get('error')
+                except Exception as e:
+                    error = f'{type(e).__name__}: {e}'
+                return {'latency_ms': (time.perf_counter() - sent) * 1000, 'error': error,
+                        'images': len(requests[i]['images'])}
+
+        try:
+            results = await asyncio.gather(*(run(i) for i in range(len(requests))))
+        finally:
+            batching = service.stats()
+            await service.stop()
+        return results, batching
+
+    results, batching = asyncio.run(main())
+    print(f"  ✓ Micro-batching: {json.dumps(batching)}")
+    return results
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def build_report(results: List[Dict], elapsed: float, sink: HistogramSink, config: Dict[str, Any]) -> Dict[str, Any]:
+    latencies = np.array([r['latency_ms'] for r in results], dtype=np.float64)
+    errors = {}
+    for r in results:
+        if r['error']:
+            errors[r['error']] = errors.get(r['error'], 0) + 1
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+    return {
+        'config': config,
+        'requests': len(results),
+        'errors': sum(errors.values()),
+        'error_kinds': errors,
+        'elapsed_s': elapsed,
+        'throughput_rps': len(results) / elapsed if elapsed else 0.0,
+        'images_per_s': sum(r['images'] for r in results) / elapsed if elapsed else 0.0,
+        'latency_ms': {
+            'mean': float(latencies.mean()) if len(latencies) else 0.0,
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'max': float(latencies.max()) if len(latencies) else 0.0,
+        },
+        'breakdown_ms': sink.summary(),
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    latency = report['latency_ms']
+    print("\n" + "="*70)
+    print("LOAD TEST REPORT")
+    print("="*70)
+    print(f"  Requests:    {report['requests']} ({report['errors']} errors)")
+    print(f"  Throughput:  {report['throughput_rps']:.1f} req/s, {report['images_per_s']:.1f} images/s")
+    print(f"  Latency:     p50 {latency['p50']:.1f} ms | p95 {latency['p95']:.1f} ms | "
+          f"p99 {latency['p99']:.1f} ms | max {latency['max']:.1f} ms")
+
+    for kind, count in report['error_kinds'].items():
+        print(f"  ⚠ {count}× {kind}")
+
+    print(f"\n  {'Span':<32} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, stats in report['breakdown_ms'].items():
+        print(f"  {name:<32} {stats['count']:>7} {stats['p50']:>9.2f} {stats['p95']:>9.2f} {stats['p99']:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Replay recorded estimate requests with stub models')
+    parser.add_argument('requests', nargs='?', default='requests.jsonl')
+    parser.add_argument('--target', default=TARGET_PIPELINE, choices=[TARGET_PIPELINE, TARGET_SERVICE])
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=None, help='Requests per second (default: as fast as possible)')
+    parser.add_argument('--repeat', type=int, default=1, help='Replay the file this many times')
+    parser.add_argument('--model-latency-ms', type=float, default=20.0)
+    parser.add_argument('--model-per-image-ms', type=float, default=5.0)
+    parser.add_argument('--cascade', action='store_true')
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=10.0)
+    parser.add_argument('--output', help='Write the report as JSON')
+    args = parser.parse_args()
+
+    print("="*70)
+    print("LOAD TEST")
+    print("="*70)
+
+    requests = load_requests(args.requests)
+    if not requests:
+        sys.exit(f"No estimate requests in {args.requests} (lines need a 'vin')")
+    requests = requests * args.repeat
+    print(f"  ✓ {len(requests)} requests, target={args.target}, concurrency={args.concurrency}, "
+          f"rate={args.rate or 'max'}")
+
+    part_model, damage_model = stub_models(args.model_latency_ms, args.model_per_image_ms)
+    sink = HistogramSink()
+    set_metrics_sink(sink)
+
+    start = time.perf_counter()
+    if args.target == TARGET_SERVICE:
+        results = run_service(requests, part_model, damage_model, args.concurrency, args.rate,
+                              args.max_batch_size, args.max_wait_ms, {'cascade': args.cascade})
+    else:
+        results = run_pipeline(requests, part_model, damage_model, args.concurrency, args.rate,
+                               {'cascade': args.cascade})
+    elapsed = time.perf_counter() - start
+
+    report = build_report(results, elapsed, sink, vars(args))
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report saved to {args.output}")
@@ -0,0 +1,308 @@
+"""
+Model Adapters
+Wrap trained Keras models in the interface the pipeline expects:
+    predict(image)         -> {class_name: probability}
+    predict_batch(images)  -> [{class_name: probability}, ...]
+    predict_array(images)  -> (N, len(classes)) float32 array aligned to .classes
+
+predict_batch preprocesses every image to 224×224, stacks them into one
+tensor and runs the model once, instead of one size-1 batch per image.
+predict_array skips the per-image dicts: the pipeline thresholds and masks
+the raw sigmoid outputs as arrays and only builds dicts for detections.
+
+MultiHeadModelAdapter serves the combined model (train_multitask_model.py):
+one backbone pass yields both the part and the damage probabilities.
+
+TFLiteModel runs models exported by export_models.py with the standalone
+TFLite interpreter, so workers can serve without importing TensorFlow.
+
+Adapters loaded from files carry a 'version' (file name, size and mtime),
+which keys their outputs in prediction_cache.PredictionCache.
+"""
+
+import json
+import os
+import pickle
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+IMG_SIZE = (224, 224)  # Same as CONFIG['img_size'] in the training scripts
+
+
+def preprocess_image(image, img_size=IMG_SIZE) -> np.ndarray:
+    """
+    Image (numpy array or PIL Image) → float32 array of shape (*img_size, 3) in [0, 1]
+    Matches the training pipeline: RGB, bilinear resize, divide by 255
+    """
+    from PIL import Image
+
+    if not isinstance(image, Image.Image):
+        array = np.asarray(image)
+        if array.shape[:2] == tuple(img_size) and array.ndim == 3 and array.dtype == np.float32:
+            return array  # Already preprocessed
+        if np.issubdtype(array.dtype, np.floating):
+            array = np.clip(array * 255.0, 0, 255)  # Preprocessed at another size
+        image = Image.fromarray(array.astype(np.uint8))
+
+    image = image.convert('RGB')
+    if image.size != (img_size[1], img_size[0]):
+        image = image.resize((img_size[1], img_size[0]), Image.BILINEAR)
+
+    return np.asarray(image, dtype=np.float32) / 255.0
+
+
+def preprocess_batch(images: Sequence, img_size=IMG_SIZE) -> np.ndarray:
+    """Stack preprocessed images into one (N, H, W, 3) float32 tensor"""
+    if isinstance(images, np.ndarray) and images.dtype == np.float32 and images.shape[1:] == (*img_size, 3):
+        return images  # Already a preprocessed batch (image_preprocessing.ImagePreprocessor)
+    batch = np.empty((len(images), *img_size, 3), dtype=np.float32)
+    for i, image in enumerate(images):
+        batch[i] = preprocess_image(image, img_size)
+    return batch
+
+
+def file_version(*paths) -> str:
+    """Version string of a model built from files: changes when any file is replaced"""
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(f'{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}')
+    return '|'.join(parts)
+
+
+def predictions_to_array(predictions: Sequence[Dict[str, float]]) -> Tuple[List[str], np.ndarray]:
+    """
+    (classes, (N, C) probabilities) from per-image {class: probability} dicts
+    Classes are taken in the first dict's order; missing classes count as 0
+    """
+    classes = list(predictions[0]) if len(predictions) else []
+    probabilities = np.array(
+        [[image_predictions.get(cls, 0.0) for cls in classes] for image_predictions in predictions],
+        dtype=np.float64
+    ).reshape(len(predictions), len(classes))
+    return classes, probabilities
+
+
+def predict_arrays(model, images: Sequence) -> Tuple[List[str], np.ndarray]:
+    """
+    (classes, (N, C) probabilities) for a batch of images
+    Array-native adapters (predict_array) never build dicts; other models go through predict_batch
+    """
+    if hasattr(model, 'predict_array'):
+        probabilities = model.predict_array(images)  # Before .classes: proxies learn them from the call
+        return model.classes, probabilities
+    return predictions_to_array(predict_batch(model, images))
+
+
+def predict_batch(model, images: Sequence) -> List[Dict[str, float]]:
+    """
+    Per-image {class: probability} dicts for a batch of images
+    Uses the model's batched path when it has one, otherwise one predict() per image
+    """
+    if not len(images):
+        return []
+    if hasattr(model, 'predict_batch'):
+        return model.predict_batch(images)
+    return [model.predict(image) for image in images]
+
+
+class KerasModelAdapter:
+    """
+    Multi-label Keras classifier + its class names (MultiLabelBinarizer classes_)
+    Any model with a Keras-style predict(batch) works, e.g. TFLiteModel
+    """
+
+    def __init__(self, model, classes: Sequence[str], img_size=IMG_SIZE, version: str = None):
+        self.model = model
+        self.classes = list(classes)
+        self.img_size = img_size
+        self.version = version
+
+    @classmethod
+    def from_files(cls, model_path: str, mlb_path: str) -> 'KerasModelAdapter':
+        """Load a saved .keras model and the pickled label encoder from training"""
+        from tensorflow import keras
+
+        with open(mlb_path, 'rb') as f:
+            mlb = pickle.load(f)
+
+        return cls(keras.models.load_model(model_path), mlb.classes_,
+                   version=file_version(model_path, mlb_path))
+
+    def _to_dict(self, probabilities: np.ndarray) -> Dict[str, float]:
+        return {cls: float(p) for cls, p in zip(self.classes, probabilities)}
+
+    def predict(self, image) -> Dict[str, float]:
+        return self.predict_batch([image])[0]
+
+    def predict_batch(self, images: Sequence) -> List[Dict[str, float]]:
+        return [self._to_dict(row) for row in self.predict_array(images)]
+
+    def predict_array(self, images: Sequence) -> np.ndarray:
+        if not len(images):
+            return np.empty((0, len(self.classes)), dtype=np.float32)
+        batch = preprocess_batch(images, self.img_size)
+        probabilities = self.model.predict(batch, batch_size=len(batch), verbose=0)
+        return np.asarray(probabilities, dtype=np.float32)
+
+
+class MultiHeadModelAdapter:
+    """
+    Shared-backbone model (train_multitask_model.py) with a part head and a damage head
+
+    part_head / damage_head are drop-in part_model / damage_model arguments
+    for detect_parts_and_damage. One forward pass produces both heads; the
+    damage head reuses the outputs cached by the part head's pass over the
+    same image objects instead of running the backbone again.
+    Forward passes (and that cache) are serialized by a lock, so heads
+    called from different threads never interleave on the model.
+    """
+
+    def __init__(self, model, part_classes: Sequence[str], damage_classes: Sequence[str], img_size=IMG_SIZE,
+                 version: str = None):
+        self.model = model
+        self.img_size = img_size
+        self.version = version
+        self.part_head = _HeadView(self, 'parts', part_classes)
+        self.damage_head = _HeadView(self, 'damage', damage_classes)
+
+        # id(image) → (image, {head: probabilities}) from the most recent forward pass
+        self._last_outputs = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_files(cls, model_path: str, part_mlb_path: str, damage_mlb_path: str) -> 'MultiHeadModelAdapter':
+        """Load the saved combined model and both pickled label encoders"""
+        from tensorflow import keras
+
+        with open(part_mlb_path, 'rb') as f:
+            part_mlb = pickle.load(f)
+        with open(damage_mlb_path, 'rb') as f:
+            damage_mlb = pickle.load(f)
+
+        return cls(keras.models.load_model(model_path), part_mlb.classes_, damage_mlb.classes_,
+                   version=file_version(model_path, part_mlb_path, damage_mlb_path))
+
+    def forward(self, images: Sequence) -> Dict[str, np.ndarray]:
+        """One forward pass → {'parts': (N, 21), 'damage': (N, 8)} probabilities"""
+        if not len(images):
+            return {
+                'parts': np.empty((0, len(self.part_head.classes)), dtype=np.float32),
+                'damage': np.empty((0, len(self.damage_head.classes)), dtype=np.float32),
+            }
+        with self._lock:
+            return self._forward(images)
+
+    def _forward(self, images: Sequence) -> Dict[str, np.ndarray]:
+        batch = preprocess_batch(images, self.img_size)
+        outputs = self.model.predict(batch, batch_size=len(batch), verbose=0)
+        if not isinstance(outputs, dict):
+            outputs = dict(zip(('parts', 'damage'), outputs))
+
+        self._last_outputs = {
+            id(image): (image, {head: outputs[head][i] for head in ('parts', 'damage')})
+            for i, image in enumerate(images)
+        }
+        return outputs
+
+    def head_outputs(self, head: str, images: Sequence) -> List[np.ndarray]:
+        """Probabilities for one head, from the cache where the same images were just run"""
+        with self._lock:
+            cached = [self._last_outputs.get(id(image)) for image in images]
+            if any(entry is None or entry[0] is not image for entry, image in zip(cached, images)):
+                outputs = self._forward(images)
+                return list(outputs[head])
+            return [entry[1][head] for entry in cached]
+
+
+class _HeadView:
+    """predict / predict_batch / predict_array for one head of a MultiHeadModelAdapter"""
+
+    def __init__(self, adapter: MultiHeadModelAdapter, head: str, classes: Sequence[str]):
+        self._adapter = adapter
+        self._head = head
+        self.classes = list(classes)
+
+    @property
+    def version(self):
+        if self._adapter.version is None:
+            return None
+        return f'{self._adapter.version}#{self._head}'
+
+    def _to_dict(self, probabilities: np.ndarray) -> Dict[str, float]:
+        return {cls: float(p) for cls, p in zip(self.classes, probabilities)}
+
+    def predict(self, image) -> Dict[str, float]:
+        return self.predict_batch([image])[0]
+
+    def predict_batch(self, images: Sequence) -> List[Dict[str, float]]:
+        return [self._to_dict(row) for row in self.predict_array(images)]
+
+    def predict_array(self, images: Sequence) -> np.ndarray:
+        if not len(images):
+            return np.empty((0, len(self.classes)), dtype=np.float32)
+        return np.asarray(self._adapter.head_outputs(self._head, images), dtype=np.float32)
+
+
+def shared_multi_head(part_model, damage_model) -> Optional[MultiHeadModelAdapter]:
+    """The MultiHeadModelAdapter when part_model and damage_model are its two heads, else None"""
+    if not isinstance(part_model, _HeadView):
+        return None
+    adapter = part_model._adapter
+    if part_model is adapter.part_head and damage_model is adapter.damage_head:
+        return adapter
+    return None
+
+
+# ============================================================
+# TFLITE RUNTIME (no TensorFlow import)
+# ============================================================
+
+def _interpreter_class():
+    """Standalone TFLite interpreter: LiteRT, then tflite-runtime, then TensorFlow as a last resort"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """
+    Exported .tflite model with a Keras-style predict(batch)
+    Returns an array for single-output models, {output_name: array} otherwise
+    """
+
+    def __init__(self, model_path: str, num_threads: int = None):
+        self.model_path = model_path
+        self._interpreter = _interpreter_class()(model_path=model_path, num_threads=num_threads)
+        self._runner = self._interpreter.get_signature_runner()
+        self._input_name, self._input = next(iter(self._runner.get_input_details().items()))
+        self._outputs = self._runner.get_output_details()
+
+    def predict(self, batch: np.ndarray, batch_size: int = None, verbose: int = 0) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        outputs = self._runner(**{self._input_name: np.asarray(batch, dtype=np.float32)})
+
+        if len(outputs) == 1:
+            return next(iter(outputs.values()))
+        return outputs
+
+
+def load_tflite_adapter(model_path: str, labels_path: str, num_threads: int = None):
+    """
+    Adapter for an exported model + its labels JSON (written by export_models.py)
+    Labels are a list of classes, or {'parts': [...], 'damage': [...]} for the combined model
+    """
+    with open(labels_path, 'r') as f:
+        labels = json.load(f)
+
+    model = TFLiteModel(model_path, num_threads=num_threads)
+    version = file_version(model_path, labels_path)
+    if isinstance(labels, dict):
+        return MultiHeadModelAdapter(model, labels['parts'], labels['damage'], version=version)
+    return KerasModelAdapter(model, labels, version=version)
@@ -0,0 +1,181 @@
+"""
+Model Registry
+Discovers trained models under models/, loads each one lazily with its
+label encoder, warms it up, and swaps in new versions without a restart
+
+- Keras backend: the .keras files + *_mlb.pkl written by the training scripts
+- TFLite backend: the .tflite files + labels JSON written by export_models.py
+  / quantize_models.py (e.g. 'part', 'part_int8', 'multitask')
+
+Requests take adapters from the registry per call; a swap replaces the
+whole {name: adapter} map at once, so in-flight requests finish on the
+version they started with and new requests see only fully warmed models.
+
+Usage:
+    registry = get_model_registry()
+    part_model, damage_model = registry.pipeline_models()
+    estimate_repair_cost(vin, images, part_model, damage_model)
+
+    registry.activate('models/v2')   # deploy: load + warm v2, then swap
+"""
+
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from export_models import EXPORTS
+from model_adapters import IMG_SIZE, KerasModelAdapter, MultiHeadModelAdapter, load_tflite_adapter
+
+MODEL_DIR = Path('models')
+
+BACKEND_KERAS = 'keras'
+BACKEND_TFLITE = 'tflite'
+
+WARMUP_BATCH = 2  # Traces the graph / allocates tensors before the first real request
+
+TFLITE_SUFFIX = '_model.tflite'
+LABELS_SUFFIX = '_model.labels.json'
+
+
+def discover_models(model_dir: Path, backend: str = BACKEND_KERAS) -> Dict[str, Tuple]:
+    """{name: model file + label file(s)} for every complete model in model_dir"""
+    model_dir = Path(model_dir)
+    found = {}
+
+    if backend == BACKEND_TFLITE:
+        for tflite_path in sorted(model_dir.glob(f'*{TFLITE_SUFFIX}')):
+            name = tflite_path.name[:-len(TFLITE_SUFFIX)]
+            labels_path = model_dir / f'{name}{LABELS_SUFFIX}'
+            if labels_path.exists():
+                found[name] = (tflite_path, labels_path)
+        return found
+
+    for name, (model_file, mlb_files) in EXPORTS.items():
+        mlb_paths = list(mlb_files.values()) if isinstance(mlb_files, dict) else [mlb_files]
+        paths = (model_dir / model_file, *(model_dir / mlb_file for mlb_file in mlb_paths))
+        if all(path.exists() for path in paths):
+            found[name] = paths
+    return found
+
+
+def load_model(paths: Tuple, backend: str = BACKEND_KERAS, num_threads: int = None):
+    """Adapter for one discovered model"""
+    if backend == BACKEND_TFLITE:
+        model_path, labels_path = paths
+        return load_tflite_adapter(str(model_path), str(labels_path), num_threads=num_threads)
+
+    model_path, *mlb_paths = [str(path) for path in paths]
+    if len(mlb_paths) == 2:
+        return MultiHeadModelAdapter.from_files(model_path, *mlb_paths)
+    return KerasModelAdapter.from_files(model_path, mlb_paths[0])
+
+
+def warmup(adapter, batch_size: int = WARMUP_BATCH):
+    """Run one throwaway batch so the first request doesn't pay graph tracing"""
+    images = np.zeros((batch_size, *IMG_SIZE, 3), dtype=np.float32)
+    if isinstance(adapter, MultiHeadModelAdapter):
+        adapter.forward(list(images))
+    else:
+        adapter.predict_batch(list(images))
+
+
+class ModelRegistry:
+    """Lazily loaded, warmed adapters by name, with atomic version swaps"""
+
+    def __init__(self, model_dir: str = MODEL_DIR, backend: str = BACKEND_KERAS,
+                 num_threads: int = None, warmup_batch: int = WARMUP_BATCH):
+        self.backend = backend
+        self.num_threads = num_threads
+        self.warmup_batch = warmup_batch
+
+        self.model_dir = Path(model_dir)
+        self._available = discover_models(self.model_dir, backend)
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def available(self):
+        """Names of the models found in the active model directory"""
+        return sorted(self._available)
+
+    def versions(self) -> Dict[str, Optional[str]]:
+        """Version of every loaded model"""
+        return {name: getattr(adapter, 'version', None) for name, adapter in self._loaded.items()}
+
+    def _load(self, paths: Tuple):
+        adapter = load_model(paths, self.backend, self.num_threads)
+        if self.warmup_batch:
+            warmup(adapter, self.warmup_batch)
+        return adapter
+
+    def get(self, name: str):
+        """Adapter for a model, loaded and warmed on first use"""
+        adapter = self._loaded.get(name)
+        if adapter is not None:
+            return adapter
+
+        with self._lock:
+            adapter = self._loaded.get(name)
+            if adapter is None:
+                if name not in self._available:
+                    raise KeyError(f"No model '{name}' in {self.model_dir} (found: {', '.join(self.available()) or 'none'})")
+                adapter = self._load(self._available[name])
+                self._loaded = {**self._loaded, name: adapter}
+        return adapter
+
+    def pipeline_models(self, part: str = 'part', damage: str = 'damage'):
+        """
+        (part_model, damage_model) for estimate_repair_cost
+        A multi-head model name (e.g. 'multitask') serves both from one backbone
+        """
+        part_adapter = self.get(part)
+        if isinstance(part_adapter, MultiHeadModelAdapter):
+            return part_adapter.part_head, part_adapter.damage_head
+        return part_adapter, self.get(damage)
+
+    def preload(self, *names: str):
+        """Load and warm models ahead of traffic (all available models by default)"""
+        for name in names or self.available():
+            self.get(name)
+
+    def activate(self, model_dir: str = None):
+        """
+        Switch to the models in model_dir (default: reload the current directory)
+
+        Every currently loaded model is loaded and warmed from the new
+        directory first; the registry then swaps over in one assignment.
+        If anything fails to load, the old version stays active.
+        """
+        model_dir = Path(model_dir) if model_dir is not None else self.model_dir
+        available = discover_models(model_dir, self.backend)
+
+        missing = [name for name in self._loaded if name not in available]
+        if missing:
+            raise KeyError(f"{model_dir} is missing loaded model(s): {', '.join(missing)}")
+
+        with self._lock:
+            loaded = {name: self._load(available[name]) for name in self._loaded}
+            self.model_dir, self._available, self._loaded = model_dir, available, loaded
+
+    def swap(self, name: str, adapter, warm: bool = True):
+        """Replace one model with an already constructed adapter"""
+        if warm and self.warmup_batch:
+            warmup(adapter, self.warmup_batch)
+        with self._lock:
+            self._loaded = {**self._loaded, name: adapter}
+
+
+# ============================================================
+# SHARED INSTANCE
+# ============================================================
+
+_registry = None
+
+
+def get_model_registry(backend: str = BACKEND_KERAS) -> ModelRegistry:
+    """Return the process-wide registry over models/ (created on first use)"""
+    global _registry
+    if _registry is None or _registry.backend != backend:
+        _registry = ModelRegistry(MODEL_DIR, backend)
+    return _registry
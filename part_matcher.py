@@ -0,0 +1,118 @@
+"""
+Part Description Classifier
+Aho-Corasick automaton over all ML_CLASS_TO_OEM_PARTS search terms
+Classifies a description into every ML class it matches in one linear pass
+
+Priority rule: a term match is dropped when a longer match of a different
+class covers it, so "rear bumper" counts for Back-bumper only and not also
+for Front-bumper via "bumper".
+"""
+
+from collections import deque
+from typing import Dict, List, Tuple, Iterable
+
+import numpy as np
+import pandas as pd
+
+# (start, end, ml_class) of one term occurrence, end exclusive
+Match = Tuple[int, int, str]
+
+
+class PartDescriptionClassifier:
+    """
+    Multi-pattern matcher built once from {ml_class: [search terms]}
+    Matching is case-insensitive substring matching, like `term in desc.lower()`
+    cache_size > 0 keeps up to that many description results for classify_many
+    (cleared when full), for callers that classify the same descriptions repeatedly
+    """
+
+    def __init__(self, class_terms: Dict[str, List[str]], cache_size: int = 0):
+        self.cache_size = cache_size
+        self._cache = {}
+        self._classes = list(class_terms.keys())
+        self._class_order = {ml_class: i for i, ml_class in enumerate(self._classes)}
+
+        # Trie: goto transitions per node, outputs as (term length, ml_class)
+        self._goto = [{}]
+        self._outputs = [[]]
+        for ml_class, terms in class_terms.items():
+            for term in terms:
+                node = 0
+                for char in term.lower():
+                    if char not in self._goto[node]:
+                        self._goto.append({})
+                        self._outputs.append([])
+                        self._goto[node][char] = len(self._goto) - 1
+                    node = self._goto[node][char]
+                self._outputs[node].append((len(term), ml_class))
+
+        # Failure links (BFS), merging outputs of the fallback node
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+                queue.append(child)
+
+    @property
+    def classes(self) -> List[str]:
+        return list(self._classes)
+
+    def find_matches(self, description: str) -> List[Match]:
+        """All term occurrences in the description"""
+        matches = []
+        node = 0
+        for i, char in enumerate(description.lower()):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, ml_class in self._outputs[node]:
+                matches.append((i + 1 - length, i + 1, ml_class))
+        return matches
+
+    def classify(self, description) -> List[str]:
+        """ML classes the description matches, after the priority rule, in class order"""
+        if not isinstance(description, str):
+            return []
+
+        matches = self.find_matches(description)
+        kept = set()
+        for start, end, ml_class in matches:
+            covered = any(
+                other_class != ml_class
+                and other_start <= start and end <= other_end
+                and other_end - other_start > end - start
+                for other_start, other_end, other_class in matches
+            )
+            if not covered:
+                kept.add(ml_class)
+
+        return sorted(kept, key=self._class_order.__getitem__)
+
+    def classify_many(self, descriptions: Iterable) -> Dict[str, List[str]]:
+        """Classify each distinct description once"""
+        unique = pd.unique(pd.Series(list(descriptions), dtype=object).dropna())
+        if not self.cache_size:
+            return {description: self.classify(description) for description in unique}
+
+        classes = {}
+        for description in unique:
+            found = self._cache.get(description)
+            if found is None:
+                found = self.classify(description)
+                if len(self._cache) >= self.cache_size:
+                    self._cache.clear()
+                self._cache[description] = found
+            classes[description] = found
+        return classes
+
+    def mask(self, descriptions: pd.Series, ml_class: str) -> np.ndarray:
+        """Boolean mask of descriptions classified as ml_class"""
+        classes = self.classify_many(descriptions)
+        matched = [description for description, found in classes.items() if ml_class in found]
+        return descriptions.isin(matched).to_numpy()
@@ -0,0 +1,147 @@
+"""
+OEM Parts Catalog
+Loads oem_parts_data.csv once and partitions it by make
+A request only touches its own make's slice (dict lookup, no column scan)
+
+At load time each partition is indexed by ML class:
+(make, ml_class) → matching row indices + price stats
+"""
+
+import os
+import threading
+from typing import Dict, List, Any
+
+import numpy as np
+import pandas as pd
+
+from part_matcher import PartDescriptionClassifier
+
+OEM_PARTS_PATH = 'oem_parts_data.csv'
+
+
+def make_key(make: str) -> str:
+    """Partition key for a make (case-insensitive)"""
+    return str(make).strip().upper()
+
+
+class PartsCatalog:
+    """
+    OEM parts partitioned into one DataFrame per upper-cased make
+
+    Only the partitions are kept, not the full table, so memory stays at
+    one copy of the catalog however many makes it grows to.
+
+    class_terms maps each ML class to the part description search terms
+    (ML_CLASS_TO_OEM_PARTS); descriptions are assigned to classes by
+    PartDescriptionClassifier.
+    """
+
+    def __init__(self, oem_df: pd.DataFrame, class_terms: Dict[str, List[str]]):
+        oem_df = oem_df.copy()
+        oem_df['Make'] = oem_df['Make'].astype(str).str.strip()
+        oem_df['Price'] = pd.to_numeric(oem_df['Price'], errors='coerce')
+
+        keys = oem_df['Make'].str.upper()
+        self._partitions = {
+            key: frame.reset_index(drop=True)
+            for key, frame in oem_df.groupby(keys, sort=False)
+        }
+        self._empty = oem_df.iloc[0:0].reset_index(drop=True)
+
+        classifier = PartDescriptionClassifier(class_terms)
+        self._class_rows = {
+            key: _index_classes(frame, classifier)
+            for key, frame in self._partitions.items()
+        }
+        self._price_stats = {
+            key: {
+                ml_class: _price_stats(frame['Price'].to_numpy()[rows])
+                for ml_class, rows in self._class_rows[key].items()
+            }
+            for key, frame in self._partitions.items()
+        }
+
+    @classmethod
+    def from_csv(cls, class_terms: Dict[str, List[str]], path: str = OEM_PARTS_PATH) -> 'PartsCatalog':
+        """Load the OEM parts CSV, partition and index it"""
+        return cls(pd.read_csv(path), class_terms)
+
+    def __len__(self) -> int:
+        return sum(len(frame) for frame in self._partitions.values())
+
+    @property
+    def makes(self) -> List[str]:
+        return list(self._partitions.keys())
+
+    def parts_for_make(self, make: str) -> pd.DataFrame:
+        """All OEM parts for a make (empty DataFrame if the make is not covered)"""
+        return self._partitions.get(make_key(make), self._empty)
+
+    def available_classes(self, make: str) -> List[str]:
+        """ML classes with at least one matching OEM part for this make"""
+        return list(self._class_rows.get(make_key(make), {}).keys())
+
+    def matching_parts(self, make: str, ml_class: str) -> pd.DataFrame:
+        """OEM parts for this make matching the ML class"""
+        rows = self._class_rows.get(make_key(make), {}).get(ml_class)
+        if rows is None:
+            return self._empty
+        return self._partitions[make_key(make)].iloc[rows]
+
+    def price_stats(self, make: str, ml_class: str) -> Dict[str, Any]:
+        """Precomputed count/mean/min/max price of the matching parts (None if no match)"""
+        return self._price_stats.get(make_key(make), {}).get(ml_class)
+
+
+def _index_classes(parts_df: pd.DataFrame, classifier: PartDescriptionClassifier) -> Dict[str, np.ndarray]:
+    """
+    Row indices per ML class for one make's parts (in class order)
+    Each unique description is classified once; classes without matches are omitted
+    """
+    descriptions = parts_df['Part Description']
+
+    matched = {ml_class: [] for ml_class in classifier.classes}
+    for description, classes in classifier.classify_many(descriptions).items():
+        for ml_class in classes:
+            matched[ml_class].append(description)
+
+    return {
+        ml_class: np.flatnonzero(descriptions.isin(found).to_numpy())
+        for ml_class, found in matched.items()
+        if found
+    }
+
+
+def _price_stats(prices: np.ndarray) -> Dict[str, Any]:
+    """Summary of the known prices (mean is NaN if none are known, as with Series.mean())"""
+    known = prices[~np.isnan(prices)]
+    return {
+        'count': int(len(known)),
+        'mean': float(known.mean()) if len(known) else float('nan'),
+        'min': float(known.min()) if len(known) else None,
+        'max': float(known.max()) if len(known) else None,
+    }
+
+
+# ============================================================
+# SHARED INSTANCE
+# ============================================================
+
+_parts_catalog = None
+_parts_catalog_mtime = None
+_parts_catalog_lock = threading.Lock()
+
+
+def get_parts_catalog(class_terms: Dict[str, List[str]]) -> PartsCatalog:
+    """
+    Return the process-wide parts catalog, loading it on first use
+    Reloads when oem_parts_data.csv is rewritten (the scrapers append to it)
+    """
+    global _parts_catalog, _parts_catalog_mtime
+    mtime = os.path.getmtime(OEM_PARTS_PATH)
+    if _parts_catalog is None or mtime != _parts_catalog_mtime:
+        with _parts_catalog_lock:
+            if _parts_catalog is None or mtime != _parts_catalog_mtime:
+                _parts_catalog = PartsCatalog.from_csv(class_terms, OEM_PARTS_PATH)
+                _parts_catalog_mtime = mtime
+    return _parts_catalog
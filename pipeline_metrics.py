@@ -0,0 +1,180 @@
+"""
+Pipeline Metrics
+Timing spans around the estimate pipeline's stages and model calls
+
+    vin_decode → part_filtering → [preprocess] → detection → consolidation → costing → response_build
+
+A PipelineTimer is active for the duration of one estimate (context-local,
+so concurrent estimates on other threads don't mix). stage() and
+record_model() are no-ops when no timer is active.
+
+Finished timers are reported to the process-wide metrics sink, if one is
+set. HistogramSink keeps recent samples per metric and summarizes them
+as p50/p95/p99; any object with observe(name, value_ms) can be a sink
+(e.g. a StatsD or Prometheus client wrapper).
+"""
+
+import contextvars
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+STAGES = ('vin_decode', 'part_filtering', 'preprocess', 'detection', 'consolidation', 'costing', 'response_build')
+
+DEFAULT_MAX_SAMPLES = 10_000
+
+_current_timer = contextvars.ContextVar('pipeline_timer', default=None)
+
+
+class PipelineTimer:
+    """Stage and model timings of one estimate"""
+
+    def __init__(self):
+        self.stages = {}
+        self.models = {}
+        self._start = time.perf_counter()
+        self.total_ms = None
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def record_model(self, role: str, images: int, seconds: float):
+        model = self.models.setdefault(role, {'calls': 0, 'images': 0, 'ms': 0.0})
+        model['calls'] += 1
+        model['images'] += images
+        model['ms'] += seconds * 1000
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Structured timing block for the estimate result (milliseconds)"""
+        return {
+            'total_ms': round(self.total_ms, 3) if self.total_ms is not None else None,
+            'stages_ms': {name: round(ms, 3) for name, ms in self.stages.items()},
+            'models': {
+                role: {
+                    **model,
+                    'ms': round(model['ms'], 3),
+                    'ms_per_image': round(model['ms'] / model['images'], 3) if model['images'] else None
+                }
+                for role, model in self.models.items()
+            }
+        }
+
+    def report(self, sink):
+        """Send every span to a metrics sink"""
+        if self.total_ms is not None:
+            sink.observe('estimate.total', self.total_ms)
+        for name, ms in self.stages.items():
+            sink.observe(f'stage.{name}', ms)
+        for role, model in self.models.items():
+            sink.observe(f'model.{role}', model['ms'])
+            if model['images']:
+                sink.observe(f'model.{role}.per_image', model['ms'] / model['images'])
+
+
+@contextmanager
+def timed_estimate(enabled: bool = True):
+    """Activate a PipelineTimer for the enclosed estimate (yields None when disabled)"""
+    if not enabled:
+        yield None
+        return
+
+    timer = PipelineTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+        timer.finish()
+        sink = get_metrics_sink()
+        if sink is not None:
+            timer.report(sink)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage under the active timer"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def record_model(role: str, images: int, seconds: float):
+    """Record one model call under the active timer"""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.record_model(role, images, seconds)
+
+
+def timing_active() -> bool:
+    return _current_timer.get() is not None
+
+
+# ============================================================
+# METRICS SINKS
+# ============================================================
+
+class HistogramSink:
+    """Recent samples per metric (bounded) with percentile summaries"""
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES):
+        self._samples = defaultdict(lambda: deque(maxlen=max_samples))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value_ms: float):
+        with self._lock:
+            self._samples[name].append(value_ms)
+            self._counts[name] += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """{metric: {count, mean, p50, p95, p99, max}} over the retained samples"""
+        with self._lock:
+            samples = {name: np.fromiter(values, dtype=np.float64) for name, values in self._samples.items()}
+            counts = dict(self._counts)
+
+        summary = {}
+        for name, values in sorted(samples.items()):
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            summary[name] = {
+                'count': counts[name],
+                'mean': float(values.mean()),
+                'p50': float(p50),
+                'p95': float(p95),
+                'p99': float(p99),
+                'max': float(values.max())
+            }
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+_metrics_sink = None
+
+
+def set_metrics_sink(sink) -> Optional[Any]:
+    """Install the process-wide metrics sink (None disables reporting); returns the previous one"""
+    global _metrics_sink
+    previous, _metrics_sink = _metrics_sink, sink
+    return previous
+
+
+def get_metrics_sink():
+    return _metrics_sink
@@ -0,0 +1,214 @@
+"""
+Prediction Cache
+Per-image model outputs keyed by (hash of the decoded image, model version),
+so a resubmitted claim only runs the models on images they have not seen
+- In-memory LRU tier (process-wide)
+- Optional on-disk tier (one JSON file per entry), shared across restarts
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from model_adapters import predict_batch, predictions_to_array
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+def image_key(image) -> str:
+    """Content hash of a decoded image (numpy array or PIL Image)"""
+    digest = hashlib.blake2b(digest_size=16)
+
+    if hasattr(image, 'tobytes') and hasattr(image, 'mode'):  # PIL Image
+        digest.update(f'{image.mode}:{image.size}'.encode())
+        digest.update(image.tobytes())
+    else:
+        array = np.ascontiguousarray(image)
+        digest.update(f'{array.dtype.str}:{array.shape}'.encode())
+        digest.update(array.data)
+
+    return digest.hexdigest()
+
+
+# Unversioned model → random token (ids are reused once an object is freed, tokens never are)
+_model_tokens = weakref.WeakKeyDictionary()
+_model_tokens_lock = threading.Lock()
+
+
+def model_version(model) -> Optional[str]:
+    """
+    Cache namespace of a model: its 'version' attribute when it has one
+    Models without one are only cached in memory, for the lifetime of the object
+    (None if the object can't be tracked that way: such models are not cached)
+    """
+    version = getattr(model, 'version', None)
+    if version is not None:
+        return str(version)
+
+    try:
+        with _model_tokens_lock:
+            token = _model_tokens.get(model)
+            if token is None:
+                token = _model_tokens[model] = uuid.uuid4().hex
+    except TypeError:  # Not hashable or not weak-referenceable
+        return None
+    return f'{type(model).__name__}@{token}'
+
+
+Predictions = Union[Dict[str, float], np.ndarray]
+
+
+class PredictionCache:
+    """
+    LRU of per-image predictions, optionally backed by a directory on disk
+    Entries are {class: probability} dicts (predict_batch) or float32
+    probability vectors aligned to the model's classes (predict_arrays)
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _disk_path(self, version: str, key: str) -> Path:
+        version_dir = hashlib.blake2b(version.encode(), digest_size=8).hexdigest()
+        return self.disk_dir / version_dir / f'{key}.json'
+
+    def get(self, version: str, key: str, use_disk: bool = True) -> Optional[Predictions]:
+        with self._lock:
+            predictions = self._entries.get((version, key))
+            if predictions is not None:
+                self._entries.move_to_end((version, key))
+                return predictions
+
+        if self.disk_dir is None or not use_disk:
+            return None
+
+        try:
+            with open(self._disk_path(version, key), 'r') as f:
+                predictions = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if isinstance(predictions, list):
+            predictions = np.asarray(predictions, dtype=np.float32)
+
+        self._remember(version, key, predictions)
+        return predictions
+
+    def put(self, version: str, key: str, predictions: Predictions, use_disk: bool = True):
+        if isinstance(predictions, dict):
+            predictions = {cls: float(p) for cls, p in predictions.items()}
+        else:
+            predictions = np.array(predictions, dtype=np.float32)  # Copy: don't pin the whole batch
+        self._remember(version, key, predictions)
+
+        if self.disk_dir is not None and use_disk:
+            path = self._disk_path(version, key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(predictions if isinstance(predictions, dict) else predictions.tolist(), f)
+            os.replace(tmp_path, path)  # Readers never see a partial file
+
+    def _remember(self, version: str, key: str, predictions: Predictions):
+        with self._lock:
+            self._entries[(version, key)] = predictions
+            self._entries.move_to_end((version, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is left as is)"""
+        with self._lock:
+            self._entries.clear()
+
+    def predict_batch(self, model, images: Sequence, keys: Sequence[str] = None) -> List[Dict[str, float]]:
+        """
+        model_adapters.predict_batch, running the model only on cache misses
+        keys: precomputed image_key() per image (hash once, reuse for both models)
+        """
+        return self._predict(model, model_version(model), images, keys, lambda misses: predict_batch(model, misses))
+
+    def predict_arrays(self, model, images: Sequence, keys: Sequence[str] = None) -> Tuple[List[str], np.ndarray]:
+        """model_adapters.predict_arrays, running the model only on cache misses"""
+        if not hasattr(model, 'predict_array'):
+            return predictions_to_array(self.predict_batch(model, images, keys))
+
+        version = model_version(model)
+        rows = self._predict(model, version and f'{version}[array]', images, keys, model.predict_array)
+        if not rows:
+            return model.classes, np.empty((0, len(model.classes)), dtype=np.float32)
+        return model.classes, np.stack(rows)
+
+    def predict_heads(self, adapter, images: Sequence, keys: Sequence[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Both heads of a MultiHeadModelAdapter ({'parts': ..., 'damage': ...} arrays)
+        One forward pass covers every image missing from either head; entries are
+        shared with predict_arrays on adapter.part_head / adapter.damage_head
+        """
+        heads = {'parts': adapter.part_head, 'damage': adapter.damage_head}
+        versions = {head: model_version(view) for head, view in heads.items()}
+        if None in versions.values():
+            return adapter.forward(images)
+        versions = {head: f'{version}[array]' for head, version in versions.items()}
+        if keys is None:
+            keys = [image_key(image) for image in images]
+        use_disk = getattr(adapter, 'version', None) is not None
+
+        rows = {head: [self.get(versions[head], key, use_disk) for key in keys] for head in heads}
+        miss_idx = [idx for idx in range(len(images)) if any(rows[head][idx] is None for head in heads)]
+        self._count(len(images) - len(miss_idx), len(miss_idx))
+
+        if miss_idx:
+            outputs = adapter.forward([images[idx] for idx in miss_idx])
+            for head in heads:
+                for idx, row in zip(miss_idx, outputs[head]):
+                    self.put(versions[head], keys[idx], row, use_disk)
+                    rows[head][idx] = row
+
+        return {
+            head: np.stack(rows[head]) if rows[head] else np.empty((0, len(view.classes)), dtype=np.float32)
+            for head, view in heads.items()
+        }
+
+    def _count(self, hits: int, misses: int):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def _predict(self, model, version: Optional[str], images: Sequence, keys: Optional[Sequence[str]],
+                 run) -> List[Predictions]:
+        """Cached predictions per image; run(miss_images) computes the misses in one call"""
+        if version is None:  # Model can't be namespaced: never cached
+            return list(run(images)) if len(images) else []
+        if keys is None:
+            keys = [image_key(image) for image in images]
+        use_disk = getattr(model, 'version', None) is not None
+
+        predictions = [self.get(version, key, use_disk) for key in keys]
+        miss_idx = [idx for idx, cached in enumerate(predictions) if cached is None]
+        self._count(len(images) - len(miss_idx), len(miss_idx))
+
+        if miss_idx:
+            computed = run([images[idx] for idx in miss_idx])
+            for idx, image_predictions in zip(miss_idx, computed):
+                self.put(version, keys[idx], image_predictions, use_disk)
+                predictions[idx] = image_predictions
+
+        return predictions
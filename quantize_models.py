@@ -0,0 +1,231 @@
+"""
+Post-Training int8 Quantization
+Converts the trained part and damage models to full-integer (int8) TFLite
+models, calibrated on a sample of their training images, and writes a report
+comparing accuracy and per-image CPU latency against the float models
+(Keras and a fresh float TFLite export), all pinned to the same thread count
+
+Calibration and evaluation reuse load_dataset / prepare_data from the
+training scripts, so the test split is the one the float models were
+evaluated on. Inputs and outputs stay float32: the quantized models are
+drop-in replacements for model_adapters.load_tflite_adapter.
+
+Usage:
+    python quantize_models.py                 # part and damage
+    python quantize_models.py damage          # selected models
+"""
+
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TF warnings
+
+import json
+import random
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from export_models import EXPORTS, MODEL_DIR, export_model, tflite_paths
+from model_adapters import TFLiteModel, preprocess_image
+
+CONFIG = {
+    'calibration_images': 200,   # Training images sampled for activation ranges
+    'latency_images': 50,        # Test images timed one at a time
+    'latency_warmup': 3,
+    'num_threads': 1,            # Per-image latency on one CPU core
+    'seed': 42
+}
+
+REPORT_PATH = MODEL_DIR / 'quantization_report.json'
+
+# name → (training script, decision threshold used by the pipeline)
+QUANTIZE = {
+    'part': ('train_part_model', 0.70),
+    'damage': ('train_damage_model', 0.60),
+}
+
+
+def pin_threads():
+    """Same intra-op thread count for Keras as for the TFLite interpreters (before any TF op runs)"""
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(CONFIG['num_threads'])
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def quantized_name(name: str) -> str:
+    """Export name of the int8 variant (models/<name>_int8_model.tflite)"""
+    return f'{name}_int8'
+
+
+def load_images(image_paths):
+    """Training-style preprocessed (N, 224, 224, 3) float32 array"""
+    from PIL import Image
+
+    batch = np.empty((len(image_paths), 224, 224, 3), dtype=np.float32)
+    for i, img_path in enumerate(image_paths):
+        with Image.open(img_path) as image:
+            batch[i] = preprocess_image(image)
+    return batch
+
+
+def load_splits(name: str):
+    """(train paths, test paths, test labels) from the model's training script"""
+    import importlib
+
+    train_script = importlib.import_module(QUANTIZE[name][0])
+    image_paths, labels_list = train_script.load_dataset()
+    (X_train, _), _, (X_test, y_test), _, _ = train_script.prepare_data(image_paths, labels_list)
+    return X_train, X_test, y_test
+
+
+def quantize_model(name: str, train_paths) -> Path:
+    """Full-integer quantization of one Keras model, calibrated on training images"""
+    import tensorflow as tf
+    from tensorflow import keras
+
+    model_file, _ = EXPORTS[name]
+    tflite_path, labels_path = tflite_paths(quantized_name(name))
+
+    rng = random.Random(CONFIG['seed'])
+    sample = rng.sample(list(train_paths), min(CONFIG['calibration_images'], len(train_paths)))
+
+    def representative_dataset():
+        for img_path in sample:
+            yield [load_images([img_path])]
+
+    print(f"\n[{name}] Calibrating on {len(sample)} training images...")
+    model = keras.models.load_model(MODEL_DIR / model_file)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    tflite_model = converter.convert()
+
+    with open(tflite_path, 'wb') as f:
+        f.write(tflite_model)
+    print(f"  ✓ Saved {tflite_path} ({len(tflite_model) / 1e6:.1f} MB)")
+
+    # Same classes as the float export
+    shutil.copyfile(tflite_paths(name)[1], labels_path)
+    return tflite_path
+
+
+# ============================================================
+# EVALUATION
+# ============================================================
+
+def score(y_true: np.ndarray, y_prob: np.ndarray, threshold: float) -> dict:
+    """Micro AUC, precision and recall at the pipeline threshold"""
+    from sklearn.metrics import precision_score, recall_score, roc_auc_score
+
+    y_pred = (y_prob > threshold).astype(int)
+    return {
+        'auc': float(roc_auc_score(y_true, y_prob, average='micro')),
+        'precision': float(precision_score(y_true, y_pred, average='micro', zero_division=0)),
+        'recall': float(recall_score(y_true, y_pred, average='micro', zero_division=0)),
+    }
+
+
+def single_image_call(model):
+    """
+    Batch-size-1 inference call to time
+    Keras models are called directly: predict() adds per-call data pipeline
+    overhead that the TFLite interpreter doesn't have
+    """
+    if isinstance(model, TFLiteModel):
+        return model.predict
+    return lambda batch: np.asarray(model(batch, training=False))
+
+
+def time_per_image(model, images: np.ndarray) -> dict:
+    """Per-image latency in ms (batch size 1)"""
+    infer = single_image_call(model)
+    for image in images[:CONFIG['latency_warmup']]:
+        infer(image[None])
+
+    timings = []
+    for image in images[:CONFIG['latency_images']]:
+        start = time.perf_counter()
+        infer(image[None])
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'mean_ms': float(np.mean(timings)),
+    }
+
+
+def evaluate_variant(model, images: np.ndarray, y_true: np.ndarray, threshold: float, size_path: Path) -> dict:
+    """Accuracy, latency and file size of one model variant"""
+    y_prob = np.asarray(model.predict(images, batch_size=16, verbose=0))
+    return {
+        **score(y_true, y_prob, threshold),
+        **time_per_image(model, images),
+        'size_mb': size_path.stat().st_size / 1e6,
+    }
+
+
+def compare_model(name: str) -> dict:
+    """Quantize one model and compare every available variant on its test split"""
+    from tensorflow import keras
+
+    model_file, _ = EXPORTS[name]
+    threshold = QUANTIZE[name][1]
+
+    train_paths, test_paths, y_test = load_splits(name)
+    export_model(name)  # Float TFLite baseline from the current Keras model (and the labels file)
+    int8_path = quantize_model(name, train_paths)
+
+    print(f"\n[{name}] Evaluating on {len(test_paths)} test images...")
+    images = load_images(test_paths)
+
+    float_tflite = tflite_paths(name)[0]
+    variants = {
+        'float_keras': (keras.models.load_model(MODEL_DIR / model_file), MODEL_DIR / model_file),
+        'float_tflite': (TFLiteModel(str(float_tflite), CONFIG['num_threads']), float_tflite),
+        'int8_tflite': (TFLiteModel(str(int8_path), CONFIG['num_threads']), int8_path),
+    }
+
+    results = {}
+    for variant, (model, path) in variants.items():
+        results[variant] = evaluate_variant(model, images, y_test, threshold, path)
+        print(f"  ✓ {variant:<13} AUC {results[variant]['auc']:.4f}  "
+              f"P {results[variant]['precision']:.4f}  R {results[variant]['recall']:.4f}  "
+              f"p50 {results[variant]['p50_ms']:.1f} ms  {results[variant]['size_mb']:.1f} MB")
+
+    baseline = results['float_keras']
+    for variant, metrics in results.items():
+        metrics['auc_delta'] = metrics['auc'] - baseline['auc']
+        metrics['speedup'] = baseline['p50_ms'] / metrics['p50_ms'] if metrics['p50_ms'] else None
+
+    return {'threshold': threshold, 'test_images': len(test_paths), 'variants': results}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(QUANTIZE)
+
+    unknown = [name for name in names if name not in QUANTIZE]
+    if unknown:
+        sys.exit(f"Unknown model(s): {', '.join(unknown)} (choose from {', '.join(QUANTIZE)})")
+
+    missing = [name for name in names if not (MODEL_DIR / EXPORTS[name][0]).exists()]
+    if missing:
+        sys.exit("Train first: " + ', '.join(f"python {QUANTIZE[name][0]}.py" for name in missing))
+
+    pin_threads()
+
+    print("="*70)
+    print("INT8 QUANTIZATION")
+    print("="*70)
+
+    report = {'config': CONFIG, 'models': {name: compare_model(name) for name in names}}
+
+    with open(REPORT_PATH, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n✓ Report saved to {REPORT_PATH}")
@@ -0,0 +1,297 @@
+"""
+Synthetic Data Generator
+Realistic stand-ins for the data files we can't ship to test boxes, with
+the same schemas the pipeline reads:
+
+- vin_dataset.csv      VIN, Make, Model, Year
+                       valid position-9 check digits, real WMIs for the
+                       makes covered by webscraper.make_url_map, position-10
+                       year codes that decode back to Year, Zipf-skewed makes
+- oem_parts_data.csv   Make, Part Number, Part Description, Price
+                       descriptions built from the ML_CLASS_TO_OEM_PARTS
+                       terms (plus non-body filler parts), log-normal prices
+                       with a per-class base price
+- model outputs        {class: probability} dicts for the part and damage
+                       models (mostly low, a few confident detections)
+
+Rows are generated and appended in chunks, so tens of millions of rows
+fit in bounded memory.
+
+Usage:
+    python synthetic_data.py --vins 10000000 --parts 2000000 --out-dir synthetic/
+    python synthetic_data.py --vins 100000 --parts 50000 --detections 1000
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cost_estimation_pipeline import DAMAGE_ACTION_MAP, ML_CLASS_TO_OEM_PARTS
+from vin_structure import VIN_TRANSLITERATION, VIN_WEIGHTS, YEAR_CODES, FIRST_CYCLE_START, CYCLE_LENGTH
+
+CHUNK_ROWS = 1_000_000
+
+# Makes in webscraper.make_url_map (aliases such as 'gm', 'mopar' and 'vw' folded
+# into their makes) → (real WMIs, models)
+MAKES = {
+    'Acura': (['19U', 'JH4'], ['MDX', 'RDX', 'TLX', 'ILX', 'TSX']),
+    'Audi': (['WAU', 'WA1'], ['A4', 'A6', 'Q5', 'Q7', 'A3']),
+    'BMW': (['WBA', 'WBS', '5UX'], ['3 Series', '5 Series', 'X3', 'X5', '7 Series']),
+    'Buick': (['1G4', '5GA'], ['Enclave', 'Encore', 'LaCrosse', 'Regal']),
+    'Cadillac': (['1G6', '1GY'], ['Escalade', 'CTS', 'XT5', 'SRX']),
+    'Chevrolet': (['1G1', '1GC', '3GN'], ['Silverado', 'Malibu', 'Equinox', 'Tahoe', 'Impala', 'Cruze']),
+    'Chrysler': (['2C3', '2C4'], ['300', 'Pacifica', 'Town and Country']),
+    'Dodge': (['1B3', '2B3', '3D7'], ['Charger', 'Challenger', 'Durango', 'Grand Caravan']),
+    'Ford': (['1FA', '1FT', '1FM'], ['F-150', 'Escape', 'Explorer', 'Fusion', 'Focus', 'Mustang']),
+    'GMC': (['1GT', '1GK'], ['Sierra', 'Yukon', 'Acadia', 'Terrain']),
+    'Honda': (['1HG', 'JHM', '2HG', '5FN'], ['Accord', 'Civic', 'CR-V', 'Pilot', 'Odyssey']),
+    'Hyundai': (['KMH', '5NP'], ['Elantra', 'Sonata', 'Tucson', 'Santa Fe']),
+    'Infiniti': (['JNK', '5N1'], ['Q50', 'QX60', 'G37', 'QX80']),
+    'Jaguar': (['SAJ'], ['XF', 'XJ', 'F-Pace']),
+    'Jeep': (['1C4', '1J4'], ['Wrangler', 'Grand Cherokee', 'Cherokee', 'Compass']),
+    'Kia': (['KNA', 'KND', '5XY'], ['Optima', 'Sorento', 'Soul', 'Forte', 'Sportage']),
+    'Land Rover': (['SAL'], ['Range Rover', 'Discovery', 'Range Rover Sport']),
+    'Lexus': (['JTH', 'JTJ', '2T2'], ['RX', 'ES', 'IS', 'GX']),
+    'Mazda': (['JM1', 'JM3'], ['Mazda3', 'Mazda6', 'CX-5', 'CX-9']),
+    'Mitsubishi': (['JA3', 'JA4'], ['Outlander', 'Lancer', 'Eclipse']),
+    'Nissan': (['1N4', 'JN8', '5N1'], ['Altima', 'Sentra', 'Rogue', 'Maxima', 'Pathfinder']),
+    'Porsche': (['WP0', 'WP1'], ['911', 'Cayenne', 'Macan']),
+    'Ram': (['1C6', '3C6'], ['1500', '2500', 'ProMaster']),
+    'Subaru': (['JF1', 'JF2', '4S3', '4S4'], ['Outback', 'Forester', 'Impreza', 'Legacy']),
+    'Toyota': (['JTD', '4T1', '5TD', '2T1'], ['Camry', 'Corolla', 'RAV4', 'Tacoma', 'Highlander', 'Prius']),
+    'Volkswagen': (['WVW', '3VW', '1VW'], ['Jetta', 'Passat', 'Golf', 'Tiguan']),
+    'Volvo': (['YV1', 'YV4'], ['XC90', 'XC60', 'S60', 'V60']),
+}
+MAKE_NAMES = list(MAKES)
+
+# Most to least common on the road (Zipf rank order for make_weights)
+MAKE_POPULARITY = ['Toyota', 'Ford', 'Chevrolet', 'Honda', 'Nissan', 'Jeep', 'Hyundai', 'Ram', 'Kia',
+                   'Subaru', 'GMC', 'Dodge', 'Volkswagen', 'Mazda', 'BMW', 'Lexus', 'Buick', 'Audi',
+                   'Chrysler', 'Acura', 'Cadillac', 'Mitsubishi', 'Volvo', 'Infiniti', 'Land Rover',
+                   'Porsche', 'Jaguar']
+
+VIN_CHARS = np.frombuffer(b'ABCDEFGHJKLMNPRSTUVWXYZ0123456789', dtype=np.uint8)  # No I, O, Q
+DIGITS = np.frombuffer(b'0123456789', dtype=np.uint8)
+LETTERS = np.frombuffer(b'ABCDEFGHJKLMNPRSTUVWXYZ', dtype=np.uint8)
+
+# Byte → check digit value / weight
+_TRANSLITERATION = np.zeros(256, dtype=np.int64)
+for _char, _value in VIN_TRANSLITERATION.items():
+    _TRANSLITERATION[ord(_char)] = _value
+_WEIGHTS = np.array(VIN_WEIGHTS, dtype=np.int64)
+_CHECK_CHARS = np.frombuffer(b'0123456789X', dtype=np.uint8)
+
+YEAR_RANGE = (1995, 2025)
+
+# Part description modifiers and non-body filler parts (match no ML class)
+MODIFIERS = ['', 'left ', 'right ', 'lh ', 'rh ', 'upper ', 'lower ', 'outer ', 'inner ']
+SUFFIXES = ['', ' assembly', ' cover', ' kit', ' w/o sensor', ' primed', ' chrome']
+FILLER_PARTS = ['oil filter', 'spark plug', 'brake pad set', 'gasket', 'wiper blade', 'bolt',
+                'clip', 'wire harness', 'sensor', 'hose clamp', 'seal', 'bearing', 'timing belt']
+FILLER_FRACTION = 0.35
+
+# Median part price per ML class (prices are log-normal around it)
+CLASS_BASE_PRICE = {
+    'Front-bumper': 420, 'Back-bumper': 400, 'Hood': 650, 'Front-door': 900, 'Back-door': 850,
+    'Trunk': 700, 'Fender': 300, 'Quarter-panel': 550, 'Rocker-panel': 220, 'Running-board': 350,
+    'Headlamp': 450, 'Tail-lamp': 250, 'Front-windshield': 380, 'Back-windshield': 320,
+    'Front-sideview-mirror': 280, 'Wheel': 400, 'Roof': 1100, 'Grille': 230, 'Door-handle': 60,
+    'Fog-lamp': 120, 'License-plate': 25,
+}
+FILLER_BASE_PRICE = 30
+PRICE_SIGMA = 0.8
+
+
+def make_weights(zipf: float = 1.1) -> np.ndarray:
+    """Zipf-skewed make probabilities aligned to MAKE_NAMES (a few makes dominate, like the real datasets)"""
+    ranks = np.array([MAKE_POPULARITY.index(make) + 1 for make in MAKE_NAMES], dtype=np.float64)
+    weights = 1.0 / ranks ** zipf
+    return weights / weights.sum()
+
+
+# ============================================================
+# VINS
+# ============================================================
+
+def check_digits(codes: np.ndarray) -> np.ndarray:
+    """Position-9 check digit bytes for an (N, 17) uint8 array of VIN characters"""
+    totals = (_TRANSLITERATION[codes] * _WEIGHTS).sum(axis=1)
+    return _CHECK_CHARS[totals % 11]
+
+
+def vin_frame(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    VIN, Make, Model, Year rows with structurally valid VINs
+    VDS (chars 4-8) is fixed per model, so WMI + VDS identifies the model
+    """
+    make_idx = rng.choice(len(MAKE_NAMES), size=rows, p=make_weights())
+    model_pick = rng.integers(0, 1 << 30, rows)
+    wmi_pick = rng.integers(0, 1 << 30, rows)
+    years = rng.integers(YEAR_RANGE[0], YEAR_RANGE[1] + 1, rows)
+
+    codes = VIN_CHARS[rng.integers(0, len(VIN_CHARS), size=(rows, 17))]
+    makes = np.empty(rows, dtype=object)
+    models = np.empty(rows, dtype=object)
+
+    for m, make in enumerate(MAKE_NAMES):
+        rows_m = np.flatnonzero(make_idx == m)
+        if not len(rows_m):
+            continue
+        wmis, make_models = MAKES[make]
+
+        wmi_bytes = np.frombuffer(''.join(wmis).encode(), dtype=np.uint8).reshape(-1, 3)
+        codes[rows_m, 0:3] = wmi_bytes[wmi_pick[rows_m] % len(wmis)]
+
+        model_idx = model_pick[rows_m] % len(make_models)
+        vds_rng = np.random.default_rng(m)
+        vds = VIN_CHARS[vds_rng.integers(0, len(VIN_CHARS), size=(len(make_models), 5))]
+        codes[rows_m, 3:8] = vds[model_idx]
+
+        makes[rows_m] = make
+        models[rows_m] = np.asarray(make_models, dtype=object)[model_idx]
+
+    # Position 7: letter from 2010 on, digit before (disambiguates the year cycle)
+    modern = years >= FIRST_CYCLE_START + CYCLE_LENGTH
+    codes[:, 6] = np.where(modern, LETTERS[codes[:, 6] % len(LETTERS)], DIGITS[codes[:, 6] % len(DIGITS)])
+
+    year_codes = np.frombuffer(YEAR_CODES.encode(), dtype=np.uint8)
+    codes[:, 9] = year_codes[(years - FIRST_CYCLE_START) % CYCLE_LENGTH]
+    codes[:, 11:17] = DIGITS[rng.integers(0, 10, size=(rows, 6))]  # Serial number
+
+    codes[:, 8] = ord('0')
+    codes[:, 8] = check_digits(codes)
+
+    return pd.DataFrame({
+        'VIN': np.ascontiguousarray(codes).view('S17').ravel().astype(str),
+        'Make': makes,
+        'Model': models,
+        'Year': years,
+    })
+
+
+# ============================================================
+# OEM PARTS
+# ============================================================
+
+def oem_parts_frame(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Make, Part Number, Part Description, Price rows (skewed makes and prices)"""
+    classes = list(ML_CLASS_TO_OEM_PARTS)
+    is_filler = rng.random(rows) < FILLER_FRACTION
+    class_idx = rng.integers(0, len(classes), rows)
+    term_pick = rng.integers(0, 1 << 30, rows)
+    modifiers = np.asarray(MODIFIERS, dtype=object)[rng.integers(0, len(MODIFIERS), rows)]
+    suffixes = np.asarray(SUFFIXES, dtype=object)[rng.integers(0, len(SUFFIXES), rows)]
+
+    descriptions = np.empty(rows, dtype=object)
+    base_prices = np.empty(rows, dtype=np.float64)
+    for c, ml_class in enumerate(classes):
+        rows_c = np.flatnonzero((class_idx == c) & ~is_filler)
+        terms = np.asarray(ML_CLASS_TO_OEM_PARTS[ml_class], dtype=object)
+        descriptions[rows_c] = terms[term_pick[rows_c] % len(terms)]
+        base_prices[rows_c] = CLASS_BASE_PRICE.get(ml_class, FILLER_BASE_PRICE)
+
+    filler_rows = np.flatnonzero(is_filler)
+    descriptions[filler_rows] = np.asarray(FILLER_PARTS, dtype=object)[term_pick[filler_rows] % len(FILLER_PARTS)]
+    base_prices[filler_rows] = FILLER_BASE_PRICE
+
+    descriptions = [f'{mod}{term}{suffix}'.title() for mod, term, suffix in zip(modifiers, descriptions, suffixes)]
+    prices = np.round(base_prices * rng.lognormal(0.0, PRICE_SIGMA, rows), 2)
+    prices[rng.random(rows) < 0.02] = np.nan  # Some listings have no price
+
+    return pd.DataFrame({
+        'Make': np.asarray(MAKE_NAMES, dtype=object)[rng.choice(len(MAKE_NAMES), size=rows, p=make_weights(0.8))],
+        'Part Number': [f'{n:05d}-{s:05d}' for n, s in zip(rng.integers(0, 10**5, rows), rng.integers(0, 10**5, rows))],
+        'Part Description': descriptions,
+        'Price': prices,
+    })
+
+
+# ============================================================
+# MODEL OUTPUTS
+# ============================================================
+
+def fake_model_outputs(images: int, rng: np.random.Generator,
+                       part_classes: List[str] = None, damage_classes: List[str] = None,
+                       detection_rate: float = 0.15) -> List[Tuple[Dict[str, float], Dict[str, float]]]:
+    """
+    (part predictions, damage predictions) per image, shaped like the models' predict() output
+    Most probabilities are low (Beta(1, 8)); each class is a confident hit (Beta(8, 1.5))
+    with probability detection_rate
+    """
+    part_classes = part_classes or list(ML_CLASS_TO_OEM_PARTS)
+    damage_classes = damage_classes or list(DAMAGE_ACTION_MAP)
+
+    def probabilities(n_classes):
+        hits = rng.random((images, n_classes)) < detection_rate
+        return np.where(hits, rng.beta(8, 1.5, (images, n_classes)), rng.beta(1, 8, (images, n_classes)))
+
+    part_probs = probabilities(len(part_classes))
+    damage_probs = probabilities(len(damage_classes))
+    return [
+        (dict(zip(part_classes, map(float, part_row))), dict(zip(damage_classes, map(float, damage_row))))
+        for part_row, damage_row in zip(part_probs, damage_probs)
+    ]
+
+
+# ============================================================
+# WRITERS
+# ============================================================
+
+def chunks(rows: int, chunk_rows: int = CHUNK_ROWS) -> Iterator[int]:
+    while rows > 0:
+        yield min(rows, chunk_rows)
+        rows -= chunk_rows
+
+
+def write_csv(path: Path, frame_fn, rows: int, rng: np.random.Generator, chunk_rows: int = CHUNK_ROWS):
+    """Generate rows chunk by chunk and append them to one CSV"""
+    start = time.perf_counter()
+    written = 0
+    for i, size in enumerate(chunks(rows, chunk_rows)):
+        frame_fn(size, rng).to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        written += size
+        print(f"  {path.name}: {written:,}/{rows:,} rows", end='\r')
+    print(f"  ✓ {path} ({rows:,} rows, {time.perf_counter() - start:.1f}s)" + " " * 10)
+
+
+def write_model_outputs(path: Path, images: int, rng: np.random.Generator):
+    """One JSON line per image: {"part_predictions": {...}, "damage_predictions": {...}}"""
+    with open(path, 'w') as f:
+        for size in chunks(images):
+            for part_predictions, damage_predictions in fake_model_outputs(size, rng):
+                f.write(json.dumps({'part_predictions': part_predictions,
+                                    'damage_predictions': damage_predictions}) + '\n')
+    print(f"  ✓ {path} ({images:,} images)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate synthetic VIN, OEM parts and model output data')
+    parser.add_argument('--vins', type=int, default=1_000_000)
+    parser.add_argument('--parts', type=int, default=100_000)
+    parser.add_argument('--detections', type=int, default=0, help='Images of fake model outputs (JSON lines)')
+    parser.add_argument('--out-dir', default='synthetic')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+
+    print("="*70)
+    print("SYNTHETIC DATA")
+    print("="*70)
+
+    if args.vins:
+        write_csv(out_dir / 'vin_dataset.csv', vin_frame, args.vins, rng, args.chunk_rows)
+    if args.parts:
+        write_csv(out_dir / 'oem_parts_data.csv', oem_parts_frame, args.parts, rng, args.chunk_rows)
+    if args.detections:
+        write_model_outputs(out_dir / 'model_outputs.jsonl', args.detections, rng)
+
+    print(f"\n✓ Point the pipeline at {out_dir}/ (run from there, with labor_hours.csv alongside)")
@@ -0,0 +1,92 @@
+"""
+VinStore regression tests
+The binary store must decode exactly what VinIndex decodes from the same CSV,
+including rows with missing Make/Model/Year and duplicate VINs
+
+Usage:
+    python -m pytest test_vin_store.py
+"""
+
+import math
+
+import pandas as pd
+import pytest
+
+from vin_index import VinIndex
+from vin_store import VinStore, build_vin_store
+
+VIN_ROWS = [
+    # VIN,                Make,      Model,     Year
+    ('1HGBH41JXMN109186', 'Honda',   'Accord',  2021),
+    ('1HGBH41JXMN109186', 'Acura',   'TLX',     2019),   # Duplicate: first row wins
+    ('1HGBH41JXMN109187', None,      'Civic',   2020),
+    ('2T1BURHE0JC000001', 'Toyota',  None,      2018),
+    ('2T1BURHE0JC000002', 'Toyota',  'Corolla', None),
+    ('3FA6P0H70HR000003', None,      None,      None),
+    ('3FA6P0H70HR000003', 'Ford',    'Fusion',  2017),   # Duplicate of an all-missing row
+    ('WBA8E9G50GN000004', 'BMW',     '3 Series', 2016),
+]
+
+QUERIES = [
+    '1HGBH41JXMN109186',   # Exact, duplicated
+    '1HGBH41JXMN109187',   # Exact, missing make
+    '2T1BURHE0JC000001',   # Exact, missing model
+    '2T1BURHE0JC000002',   # Exact, missing year
+    '3FA6P0H70HR000003',   # Exact, all missing
+    '1HGBH41JXMN999999',   # Prefix match
+    '2T1BURHE0JC999999',   # Prefix match onto missing fields
+    'WBA8E9G50GN000004',
+    'ZZZZZZZZZZZZZZZZZ',   # Miss
+]
+
+
+def same(a, b) -> bool:
+    """Equal, treating missing values (None / NaN) as equal to each other"""
+    if pd.isna(a) or pd.isna(b):
+        return pd.isna(a) and pd.isna(b)
+    return a == b
+
+
+@pytest.fixture
+def lookups(tmp_path):
+    csv_path = tmp_path / 'vin_dataset.csv'
+    store_path = tmp_path / 'vin_dataset.bin'
+    pd.DataFrame(VIN_ROWS, columns=['VIN', 'Make', 'Model', 'Year']).to_csv(csv_path, index=False)
+
+    build_vin_store(str(csv_path), str(store_path))
+    return VinIndex.from_csv(str(csv_path)), VinStore(str(store_path))
+
+
+def test_store_keeps_first_row_per_vin(lookups):
+    index, store = lookups
+    assert len(store) == len({vin for vin, *_ in VIN_ROWS})
+    assert store.lookup('1HGBH41JXMN109186')['make'] == 'Honda'
+
+
+@pytest.mark.parametrize('vin', QUERIES)
+def test_lookup_matches_vin_index(lookups, vin):
+    index, store = lookups
+    expected, actual = index.lookup(vin), store.lookup(vin)
+
+    if expected is None:
+        assert actual is None
+        return
+    for field in ('make', 'model', 'year'):
+        assert same(actual[field], expected[field]), (vin, field, actual[field], expected[field])
+
+
+def test_missing_fields_decode_as_missing(lookups):
+    _, store = lookups
+    vehicle = store.lookup('3FA6P0H70HR000003')
+    assert all(isinstance(vehicle[field], float) and math.isnan(vehicle[field])
+               for field in ('make', 'model', 'year'))
+
+
+def test_lookup_many_matches_vin_index(lookups):
+    index, store = lookups
+    expected, actual = index.lookup_many(QUERIES), store.lookup_many(QUERIES)
+
+    assert list(actual['match']) == list(expected['match'])
+    for field in ('vin', 'make', 'model', 'year'):
+        for a, b in zip(actual[field], expected[field]):
+            assert same(a, b), (field, a, b)
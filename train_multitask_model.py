@@ -0,0 +1,439 @@
+"""
+Combined Model: Part Identification + Damage Classification
+One shared EfficientNetB3 backbone, two multi-label sigmoid heads
+(21 part classes, 8 damage types) → one forward pass per image at inference
+
+The two datasets are labeled for one task each, so every image only
+contributes to the loss of its own head (per-output sample weights).
+"""
+
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TF warnings
+
+import json
+import pickle
+import numpy as np
+from pathlib import Path
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.keras import layers
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import MultiLabelBinarizer
+import matplotlib.pyplot as plt
+
+# Configuration
+CONFIG = {
+    'dataset_root': Path.home() / ".cache/kagglehub/datasets/humansintheloop/car-parts-and-car-damages/versions/2",
+    # Same annotation folders as train_part_model.py / train_damage_model.py
+    'part_img_dir': 'Car damages dataset/File1/img',
+    'part_ann_dir': 'Car damages dataset/File1/ann',
+    'damage_img_dir': 'Car parts dataset/File1/img',
+    'damage_ann_dir': 'Car parts dataset/File1/ann',
+    'img_size': (224, 224),
+    'batch_size': 16,
+    'epochs': 30,
+    'learning_rate': 0.001,
+    'test_size': 0.15,
+    'val_size': 0.15,
+    'seed': 42
+}
+
+# Model save path
+MODEL_DIR = Path('models')
+MODEL_DIR.mkdir(exist_ok=True)
+
+HEADS = ('parts', 'damage')
+
+print("="*70)
+print("COMBINED MODEL: PART IDENTIFICATION + DAMAGE CLASSIFICATION")
+print("="*70)
+
+# ============================================================
+# 1. DATA LOADING
+# ============================================================
+
+def load_annotated_images(img_dir, ann_dir):
+    """Load image paths and multi-label annotations from one dataset folder"""
+    image_paths = []
+    labels_list = []
+
+    for ann_file in sorted(ann_dir.glob("*.json")):
+        # Load annotation
+        with open(ann_file, 'r') as f:
+            data = json.load(f)
+
+        # Get image path
+        img_name = ann_file.stem  # Remove .json extension
+        img_path = img_dir / img_name
+
+        # Check if image exists (might be .png or .jpg)
+        if not img_path.exists():
+            # Try with .png extension
+            img_path = img_dir / (img_name + '.png') if not img_name.endswith(('.png', '.jpg')) else img_path
+            if not img_path.exists():
+                # Try with .jpg
+                img_path = img_dir / (img_name.replace('.png', '.jpg') if '.png' in img_name else img_name + '.jpg')
+
+        if img_path.exists():
+            # Extract all class labels from objects
+            labels = list(set([obj['classTitle'] for obj in data['objects']]))
+
+            image_paths.append(str(img_path))
+            labels_list.append(labels)
+
+    return image_paths, labels_list
+
+
+def load_dataset():
+    """Load both datasets"""
+    print("\n[1/6] Loading datasets...")
+
+    root = CONFIG['dataset_root']
+    part_data = load_annotated_images(root / CONFIG['part_img_dir'], root / CONFIG['part_ann_dir'])
+    damage_data = load_annotated_images(root / CONFIG['damage_img_dir'], root / CONFIG['damage_ann_dir'])
+
+    print(f"  ✓ Part images:   {len(part_data[0])}")
+    print(f"  ✓ Damage images: {len(damage_data[0])}")
+    return part_data, damage_data
+
+
+# ============================================================
+# 2. DATA PREPROCESSING
+# ============================================================
+
+def prepare_data(part_data, damage_data):
+    """Encode labels for both heads, mask the head each image has no labels for, split"""
+    print("\n[2/6] Preparing data...")
+
+    part_paths, part_labels = part_data
+    damage_paths, damage_labels = damage_data
+
+    part_mlb = MultiLabelBinarizer()
+    y_part = part_mlb.fit_transform(part_labels)
+    damage_mlb = MultiLabelBinarizer()
+    y_damage = damage_mlb.fit_transform(damage_labels)
+
+    print(f"  ✓ Part classes:  {len(part_mlb.classes_)}")
+    print(f"  ✓ Damage types:  {len(damage_mlb.classes_)}")
+
+    n_part, n_damage = len(part_paths), len(damage_paths)
+
+    # Part images: damage head masked out; damage images: part head masked out
+    paths = np.array(part_paths + damage_paths)
+    y = {
+        'parts': np.vstack([y_part, np.zeros((n_damage, y_part.shape[1]), dtype=y_part.dtype)]),
+        'damage': np.vstack([np.zeros((n_part, y_damage.shape[1]), dtype=y_damage.dtype), y_damage]),
+    }
+    w = {
+        'parts': np.concatenate([np.ones(n_part), np.zeros(n_damage)]).astype(np.float32),
+        'damage': np.concatenate([np.zeros(n_part), np.ones(n_damage)]).astype(np.float32),
+    }
+
+    # Split dataset: 70% train, 15% val, 15% test (stratified by source dataset)
+    source = np.concatenate([np.zeros(n_part), np.ones(n_damage)])
+    idx_train, idx_temp = train_test_split(
+        np.arange(len(paths)),
+        test_size=(CONFIG['test_size'] + CONFIG['val_size']),
+        random_state=CONFIG['seed'],
+        stratify=source
+    )
+    idx_val, idx_test = train_test_split(
+        idx_temp,
+        test_size=0.5,
+        random_state=CONFIG['seed'],
+        stratify=source[idx_temp]
+    )
+
+    def subset(idx):
+        return paths[idx], {h: y[h][idx] for h in HEADS}, {h: w[h][idx] for h in HEADS}
+
+    print(f"  ✓ Training:   {len(idx_train)} images")
+    print(f"  ✓ Validation: {len(idx_val)} images")
+    print(f"  ✓ Testing:    {len(idx_test)} images")
+
+    return subset(idx_train), subset(idx_val), subset(idx_test), part_mlb, damage_mlb
+
+
+# ============================================================
+# 3. DATA GENERATORS
+# ============================================================
+
+def create_dataset(image_paths, labels, weights, augment=False):
+    """Create TF dataset yielding (image, labels per head, sample weights per head)"""
+
+    def load_and_preprocess_image(img_path, label, weight):
+        # Load image
+        img = tf.io.read_file(img_path)
+        img = tf.image.decode_image(img, channels=3, expand_animations=False)
+        img = tf.image.resize(img, CONFIG['img_size'])
+
+        # Data augmentation for training
+        if augment:
+            img = tf.image.random_flip_left_right(img)
+            img = tf.image.random_brightness(img, 0.2)
+            img = tf.image.random_contrast(img, 0.8, 1.2)
+            img = tf.image.random_saturation(img, 0.8, 1.2)
+
+        # Normalize to [0, 1]
+        img = img / 255.0
+
+        return img, label, weight
+
+    # Create dataset
+    dataset = tf.data.Dataset.from_tensor_slices((image_paths, labels, weights))
+    dataset = dataset.map(load_and_preprocess_image, num_parallel_calls=tf.data.AUTOTUNE)
+    dataset = dataset.batch(CONFIG['batch_size'])
+    dataset = dataset.prefetch(tf.data.AUTOTUNE)
+
+    return dataset
+
+
+# ============================================================
+# 4. MODEL ARCHITECTURE
+# ============================================================
+
+def build_model(num_part_classes, num_damage_classes):
+    """Build EfficientNetB3 backbone with a part head and a damage head"""
+    print("\n[3/6] Building model...")
+
+    # Shared backbone: EfficientNetB3 pretrained on ImageNet
+    base_model = keras.applications.EfficientNetB3(
+        weights='imagenet',
+        include_top=False,
+        input_shape=(*CONFIG['img_size'], 3)
+    )
+
+    # Freeze base model initially
+    base_model.trainable = False
+
+    inputs = layers.Input(shape=(*CONFIG['img_size'], 3))
+
+    # Preprocessing for EfficientNet
+    x = keras.applications.efficientnet.preprocess_input(inputs)
+
+    # Shared features
+    x = base_model(x, training=False)
+    features = layers.GlobalAveragePooling2D()(x)
+
+    # Part head (same shape as train_part_model.py)
+    p = layers.Dropout(0.5)(features)
+    p = layers.Dense(256, activation='relu')(p)
+    p = layers.Dropout(0.3)(p)
+    p = layers.Dense(128, activation='relu')(p)
+    part_outputs = layers.Dense(num_part_classes, activation='sigmoid', name='parts')(p)
+
+    # Damage head (same shape as train_damage_model.py)
+    d = layers.Dropout(0.4)(features)
+    d = layers.Dense(128, activation='relu')(d)
+    d = layers.Dropout(0.3)(d)
+    d = layers.Dense(64, activation='relu')(d)
+    d = layers.Dropout(0.2)(d)
+    damage_outputs = layers.Dense(num_damage_classes, activation='sigmoid', name='damage')(d)
+
+    model = keras.Model(
+        inputs=inputs,
+        outputs={'parts': part_outputs, 'damage': damage_outputs},
+        name='multitask_model'
+    )
+
+    print(f"  ✓ Model built with {num_part_classes} part + {num_damage_classes} damage outputs")
+    print(f"  ✓ Trainable parameters: {model.count_params():,}")
+
+    return model, base_model
+
+
+# ============================================================
+# 5. TRAINING
+# ============================================================
+
+def compile_model(model, learning_rate):
+    """Binary cross-entropy per head; metrics weighted so masked images don't count"""
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate),
+        loss={h: 'binary_crossentropy' for h in HEADS},
+        weighted_metrics={
+            h: [
+                'binary_accuracy',
+                keras.metrics.AUC(name='auc', multi_label=True),
+                keras.metrics.Precision(name='precision'),
+                keras.metrics.Recall(name='recall')
+            ]
+            for h in HEADS
+        }
+    )
+
+
+def train_model(model, base_model, train_ds, val_ds):
+    """Two-stage training: frozen base → fine-tuning"""
+    print("\n[4/6] Training model...")
+
+    compile_model(model, CONFIG['learning_rate'])
+
+    # Callbacks
+    callbacks = [
+        keras.callbacks.EarlyStopping(
+            monitor='val_loss',
+            patience=5,
+            restore_best_weights=True,
+            verbose=1
+        ),
+        keras.callbacks.ReduceLROnPlateau(
+            monitor='val_loss',
+            factor=0.5,
+            patience=3,
+            verbose=1,
+            min_lr=1e-7
+        ),
+        keras.callbacks.ModelCheckpoint(
+            MODEL_DIR / 'multitask_model_best.keras',
+            monitor='val_loss',
+            mode='min',
+            save_best_only=True,
+            verbose=1
+        )
+    ]
+
+    print("\n  Stage 1: Training with frozen base model...")
+    history1 = model.fit(
+        train_ds,
+        validation_data=val_ds,
+        epochs=10,
+        callbacks=callbacks,
+        verbose=1
+    )
+
+    # Stage 2: Fine-tuning
+    print("\n  Stage 2: Fine-tuning last layers...")
+    base_model.trainable = True
+
+    # Freeze all layers except last 50
+    for layer in base_model.layers[:-50]:
+        layer.trainable = False
+
+    # Recompile with lower learning rate
+    compile_model(model, CONFIG['learning_rate'] * 0.1)
+
+    history2 = model.fit(
+        train_ds,
+        validation_data=val_ds,
+        epochs=20,
+        callbacks=callbacks,
+        verbose=1
+    )
+
+    # Combine histories
+    history = {
+        key: history1.history[key] + history2.history.get(key, [])
+        for key in history1.history.keys()
+    }
+
+    return history
+
+
+# ============================================================
+# 6. EVALUATION
+# ============================================================
+
+def evaluate_model(model, test_ds):
+    """Evaluate both heads on the test set"""
+    print("\n[5/6] Evaluating model...")
+
+    results = model.evaluate(test_ds, verbose=1, return_dict=True)
+
+    print(f"\n  Test Results:")
+    print(f"  ✓ Loss:           {results['loss']:.4f}")
+    for h in HEADS:
+        precision = results[f'{h}_precision']
+        recall = results[f'{h}_recall']
+        f1 = 2 * (precision * recall) / (precision + recall + 1e-7)
+        print(f"\n  [{h}]")
+        print(f"  ✓ AUC:            {results[f'{h}_auc']:.4f}")
+        print(f"  ✓ Precision:      {precision:.4f}")
+        print(f"  ✓ Recall:         {recall:.4f}")
+        print(f"  ✓ F1-Score:       {f1:.4f}")
+
+    return results
+
+
+# ============================================================
+# 7. VISUALIZATION
+# ============================================================
+
+def plot_training_history(history):
+    """Plot loss and AUC per head"""
+    print("\n[6/6] Plotting training history...")
+
+    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+    fig.suptitle('Combined Model Training History', fontsize=14, fontweight='bold')
+
+    # Total loss
+    axes[0].plot(history['loss'], label='Training')
+    axes[0].plot(history['val_loss'], label='Validation')
+    axes[0].set_title('Loss (both heads)')
+    axes[0].set_xlabel('Epoch')
+    axes[0].set_ylabel('Binary Cross-Entropy')
+    axes[0].legend()
+    axes[0].grid(True, alpha=0.3)
+
+    # AUC per head
+    for ax, h in zip(axes[1:], HEADS):
+        ax.plot(history[f'{h}_auc'], label='Training')
+        ax.plot(history[f'val_{h}_auc'], label='Validation')
+        ax.set_title(f'AUC-ROC ({h})')
+        ax.set_xlabel('Epoch')
+        ax.set_ylabel('AUC')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(MODEL_DIR / 'multitask_model_training_history.png', dpi=150, bbox_inches='tight')
+    print(f"  ✓ Saved training plot to {MODEL_DIR / 'multitask_model_training_history.png'}")
+
+
+# ============================================================
+# MAIN TRAINING PIPELINE
+# ============================================================
+
+if __name__ == "__main__":
+    # Set random seeds
+    np.random.seed(CONFIG['seed'])
+    tf.random.set_seed(CONFIG['seed'])
+
+    # Load data
+    part_data, damage_data = load_dataset()
+
+    # Prepare data
+    train, val, test, part_mlb, damage_mlb = prepare_data(part_data, damage_data)
+
+    # Create datasets
+    print("\n  Creating TF datasets...")
+    train_ds = create_dataset(*train, augment=True)
+    val_ds = create_dataset(*val, augment=False)
+    test_ds = create_dataset(*test, augment=False)
+
+    # Build model
+    model, base_model = build_model(len(part_mlb.classes_), len(damage_mlb.classes_))
+
+    # Train model
+    history = train_model(model, base_model, train_ds, val_ds)
+
+    # Evaluate
+    evaluate_model(model, test_ds)
+
+    # Save final model
+    model.save(MODEL_DIR / 'multitask_model_final.keras')
+    print(f"\n✓ Model saved to {MODEL_DIR / 'multitask_model_final.keras'}")
+
+    # Save label encoders (one per head)
+    with open(MODEL_DIR / 'multitask_part_mlb.pkl', 'wb') as f:
+        pickle.dump(part_mlb, f)
+    with open(MODEL_DIR / 'multitask_damage_mlb.pkl', 'wb') as f:
+        pickle.dump(damage_mlb, f)
+    print(f"✓ Label encoders saved to {MODEL_DIR / 'multitask_part_mlb.pkl'} and {MODEL_DIR / 'multitask_damage_mlb.pkl'}")
+
+    # Plot history
+    plot_training_history(history)
+
+    print("\n" + "="*70)
+    print("✓ COMBINED MODEL TRAINING COMPLETE!")
+    print("="*70)
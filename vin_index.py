@@ -0,0 +1,170 @@
+"""
+In-memory VIN Index
+Loads vin_dataset.csv once and answers VIN lookups without re-scanning the table
+- Exact VIN → hash lookup
+- WMI + VDS prefix (first 11 chars) → bisect over sorted VIN keys
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, Optional, Iterable
+
+import numpy as np
+import pandas as pd
+
+VIN_DATASET_PATH = 'vin_dataset.csv'
+VIN_PREFIX_LENGTH = 11  # WMI + VDS (first 11 chars)
+
+_MAX_CHAR = '\U0010ffff'  # Sorts after any character a VIN can contain
+
+# Batch decode match kinds
+MATCH_EXACT = 'exact'
+MATCH_PREFIX = 'prefix'
+MATCH_MISS = 'miss'
+
+
+class VinIndex:
+    """
+    VIN lookup table built once from the VIN dataset
+
+    When several rows share a VIN (or a prefix), the row appearing first
+    in the CSV wins, same as filtering the DataFrame and taking iloc[0].
+    """
+
+    def __init__(self, vin_df: pd.DataFrame):
+        vins = vin_df['VIN'].astype(str).tolist()
+
+        self._makes = vin_df['Make'].to_numpy()
+        self._models = vin_df['Model'].to_numpy()
+        self._years = vin_df['Year'].to_numpy()
+
+        # Exact match: first row for each VIN
+        self._positions = {}
+        for row, vin in enumerate(vins):
+            self._positions.setdefault(vin, row)
+
+        # Prefix match: VINs sorted (stable, so ties stay in file order)
+        keys = np.asarray(vins, dtype=object)
+        order = np.argsort(keys, kind='stable')
+        self._keys = keys[order]
+        self._rows = order.astype(np.int64)
+
+    @classmethod
+    def from_csv(cls, path: str = VIN_DATASET_PATH) -> 'VinIndex':
+        """Load the VIN dataset from CSV and build the index"""
+        vin_df = pd.read_csv(path, usecols=['VIN', 'Make', 'Model', 'Year'])
+        return cls(vin_df)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _vehicle(self, row: int) -> Dict[str, Any]:
+        return {
+            'make': self._makes[row],
+            'model': self._models[row],
+            'year': self._years[row],
+        }
+
+    def lookup_exact(self, vin: str) -> Optional[Dict[str, Any]]:
+        """Exact VIN match"""
+        row = self._positions.get(vin)
+        if row is None:
+            return None
+        return self._vehicle(row)
+
+    def lookup_prefix(self, prefix: str) -> Optional[Dict[str, Any]]:
+        """First VIN (in file order) starting with prefix"""
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + _MAX_CHAR, lo)
+
+        if lo == hi:
+            return None
+        return self._vehicle(int(self._rows[lo:hi].min()))
+
+    def lookup(self, vin: str) -> Optional[Dict[str, Any]]:
+        """Exact match first, then partial match on WMI + VDS"""
+        vehicle = self.lookup_exact(vin)
+        if vehicle is None:
+            vehicle = self.lookup_prefix(vin[:VIN_PREFIX_LENGTH])
+        return vehicle
+
+    def lookup_many(self, vins: Iterable[str]) -> pd.DataFrame:
+        """
+        Decode a batch of VINs in one pass
+        Exact matches via a hash join, prefix fallback (searchsorted) only for the misses
+        """
+        vins = pd.Series(list(vins), dtype=object)
+        rows = vins.map(self._positions).fillna(-1).to_numpy(dtype=np.int64)
+        match = np.where(rows >= 0, MATCH_EXACT, MATCH_MISS).astype(object)
+
+        misses = np.flatnonzero(rows < 0)
+        if len(misses):
+            prefixes = vins.iloc[misses].fillna('').astype(str).str[:VIN_PREFIX_LENGTH].to_numpy(dtype=object)
+            lo = np.searchsorted(self._keys, prefixes, side='left')
+            hi = np.searchsorted(self._keys, prefixes + _MAX_CHAR, side='left')
+
+            for i, start, stop in zip(misses, lo, hi):
+                if start < stop:
+                    rows[i] = self._rows[start:stop].min()
+                    match[i] = MATCH_PREFIX
+
+        found = rows >= 0
+        take = np.where(found, rows, 0)
+        return decoded_frame(vins, match, found, self._makes[take], self._models[take], self._years[take])
+
+
+def decoded_frame(vins: pd.Series, match: np.ndarray, found: np.ndarray,
+                  makes: np.ndarray, models: np.ndarray, years: np.ndarray) -> pd.DataFrame:
+    """
+    Columnar batch decode result: one row per input VIN
+    Vehicle columns are None where nothing matched
+    """
+    def column(values):
+        values = np.asarray(values).astype(object)
+        values[~found] = None
+        return values
+
+    return pd.DataFrame({
+        'vin': vins.to_numpy(dtype=object),
+        'make': column(makes),
+        'model': column(models),
+        'year': column(years),
+        'match': match,
+    })
+
+
+# ============================================================
+# SHARED INSTANCE
+# ============================================================
+
+_vin_index = None
+_vin_index_lock = threading.Lock()
+
+
+def _store_is_current(store_path: str, csv_path: str) -> bool:
+    """Binary store exists and is not older than the CSV it was built from"""
+    if not os.path.exists(store_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(store_path) >= os.path.getmtime(csv_path)
+
+
+def get_vin_index():
+    """
+    Return the process-wide VIN lookup, loading it on first use
+    Uses the memory-mapped binary store (vin_store.py) when it is up to date,
+    otherwise parses the CSV into a VinIndex
+    """
+    global _vin_index
+    if _vin_index is None:
+        with _vin_index_lock:
+            if _vin_index is None:
+                from vin_store import VinStore, VIN_STORE_PATH
+
+                if _store_is_current(VIN_STORE_PATH, VIN_DATASET_PATH):
+                    _vin_index = VinStore(VIN_STORE_PATH)
+                else:
+                    _vin_index = VinIndex.from_csv(VIN_DATASET_PATH)
+    return _vin_index
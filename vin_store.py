@@ -0,0 +1,244 @@
+"""
+Compact Binary VIN Store
+Build step: vin_dataset.csv → sorted fixed-width binary file + string dictionaries
+Lookup: binary search over the memory-mapped file (no CSV parsing at startup)
+
+File layout (vin_dataset.bin), little-endian, each section padded to 8 bytes:
+    header   8s magic, u8 record count
+    vin      S17 × n   (sorted, NUL-padded)
+    row      u4 × n    (row in the source CSV, to keep first-row-wins)
+    model    u4 × n    (code into models dictionary)
+    make     u2 × n    (code into makes dictionary)
+    year     u2 × n    (code into years dictionary)
+
+Dictionaries live alongside in vin_dataset.bin.json.
+
+Usage:
+    python vin_store.py [vin_dataset.csv] [vin_dataset.bin]
+"""
+
+import json
+import mmap
+import os
+import sys
+from typing import Dict, Any, Optional, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from vin_index import (
+    VIN_DATASET_PATH, VIN_PREFIX_LENGTH,
+    MATCH_EXACT, MATCH_PREFIX, MATCH_MISS, decoded_frame,
+)
+
+VIN_STORE_PATH = 'vin_dataset.bin'
+VIN_LENGTH = 17
+
+_MAGIC = b'VINSTOR1'
+_HEADER = np.dtype([('magic', 'S8'), ('count', '<u8')])
+_SECTIONS = [
+    ('vin', np.dtype(f'S{VIN_LENGTH}')),
+    ('row', np.dtype('<u4')),
+    ('model', np.dtype('<u4')),
+    ('make', np.dtype('<u2')),
+    ('year', np.dtype('<u2')),
+]
+
+
+def _padded(nbytes: int) -> int:
+    return (nbytes + 7) // 8 * 8
+
+
+def _dictionary_path(store_path: str) -> str:
+    return store_path + '.json'
+
+
+# ============================================================
+# BUILD
+# ============================================================
+
+def _encode(values: pd.Series, dtype: np.dtype) -> Tuple[np.ndarray, List]:
+    """
+    Dictionary-encode a column into integer codes
+    Missing values get their own code (decoded back to NaN, same as VinIndex)
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    if len(uniques) > np.iinfo(dtype).max:
+        raise ValueError(f"{values.name}: {len(uniques)} distinct values do not fit in {dtype}")
+    return codes.astype(dtype), uniques.tolist()
+
+
+def build_vin_store(csv_path: str = VIN_DATASET_PATH, store_path: str = VIN_STORE_PATH) -> int:
+    """
+    Convert the VIN CSV into the binary store
+    Returns the number of records written
+    """
+    vin_df = pd.read_csv(csv_path, usecols=['VIN', 'Make', 'Model', 'Year'])
+
+    # Exact lookups take the first row for a VIN, so later duplicates are never read
+    vin_df['row'] = np.arange(len(vin_df), dtype=np.uint32)
+    vin_df = vin_df.drop_duplicates('VIN', keep='first')
+
+    vins = vin_df['VIN'].astype(str)
+    if (vins.str.len() > VIN_LENGTH).any():
+        raise ValueError(f"VINs longer than {VIN_LENGTH} characters in {csv_path}")
+
+    columns = {'vin': vins.str.encode('ascii').to_numpy(dtype=f'S{VIN_LENGTH}')}
+    columns['row'] = vin_df['row'].to_numpy(dtype='<u4')
+    columns['make'], makes = _encode(vin_df['Make'], np.dtype('<u2'))
+    columns['model'], models = _encode(vin_df['Model'], np.dtype('<u4'))
+    columns['year'], years = _encode(vin_df['Year'], np.dtype('<u2'))
+
+    order = np.argsort(columns['vin'], kind='stable')
+    count = len(order)
+
+    header = np.array([(_MAGIC, count)], dtype=_HEADER)
+
+    tmp_path = store_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header.tobytes())
+        for name, dtype in _SECTIONS:
+            data = columns[name][order].astype(dtype).tobytes()
+            f.write(data)
+            f.write(b'\0' * (_padded(len(data)) - len(data)))
+
+    with open(_dictionary_path(store_path) + '.tmp', 'w') as f:
+        json.dump({'makes': makes, 'models': models, 'years': years}, f)
+
+    os.replace(_dictionary_path(store_path) + '.tmp', _dictionary_path(store_path))
+    os.replace(tmp_path, store_path)
+
+    return count
+
+
+# ============================================================
+# LOOKUP
+# ============================================================
+
+class VinStore:
+    """
+    Read-only VIN lookup over the memory-mapped binary store
+
+    Same lookup interface as VinIndex. Pages are shared between
+    forked workers and only touched on demand.
+    """
+
+    def __init__(self, store_path: str = VIN_STORE_PATH):
+        with open(_dictionary_path(store_path), 'r') as f:
+            dictionaries = json.load(f)
+        self._makes = dictionaries['makes']
+        self._models = dictionaries['models']
+        self._years = dictionaries['years']
+
+        with open(store_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = np.frombuffer(self._mmap, dtype=_HEADER, count=1)[0]
+        if header['magic'] != _MAGIC:
+            raise ValueError(f"{store_path} is not a VIN store")
+        count = int(header['count'])
+
+        columns = {}
+        offset = _HEADER.itemsize
+        for name, dtype in _SECTIONS:
+            columns[name] = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset)
+            offset += _padded(count * dtype.itemsize)
+
+        self._vin = columns['vin']
+        self._row = columns['row']
+        self._make_codes = columns['make']
+        self._model_codes = columns['model']
+        self._year_codes = columns['year']
+
+    def __len__(self) -> int:
+        return len(self._vin)
+
+    def _vehicle(self, position: int) -> Dict[str, Any]:
+        return {
+            'make': self._makes[self._make_codes[position]],
+            'model': self._models[self._model_codes[position]],
+            'year': self._years[self._year_codes[position]],
+        }
+
+    def lookup_exact(self, vin: str) -> Optional[Dict[str, Any]]:
+        """Exact VIN match"""
+        if len(vin) > VIN_LENGTH:
+            return None
+        try:
+            key = vin.encode('ascii')
+        except UnicodeEncodeError:
+            return None
+
+        position = int(np.searchsorted(self._vin, key))
+        if position < len(self._vin) and self._vin[position] == key:
+            return self._vehicle(position)
+        return None
+
+    def lookup_prefix(self, prefix: str) -> Optional[Dict[str, Any]]:
+        """First VIN (in source file order) starting with prefix"""
+        try:
+            key = prefix.encode('ascii')
+        except UnicodeEncodeError:
+            return None
+
+        lo = int(np.searchsorted(self._vin, key, side='left'))
+        hi = int(np.searchsorted(self._vin, key + b'\xff', side='left'))
+        if lo == hi:
+            return None
+        return self._vehicle(lo + int(np.argmin(self._row[lo:hi])))
+
+    def lookup(self, vin: str) -> Optional[Dict[str, Any]]:
+        """Exact match first, then partial match on WMI + VDS"""
+        vehicle = self.lookup_exact(vin)
+        if vehicle is None:
+            vehicle = self.lookup_prefix(vin[:VIN_PREFIX_LENGTH])
+        return vehicle
+
+    def lookup_many(self, vins: Iterable[str]) -> pd.DataFrame:
+        """
+        Decode a batch of VINs in one pass
+        Sorted merge (searchsorted) for exact matches, prefix fallback only for the misses
+        """
+        vins = pd.Series(list(vins), dtype=object)
+        text = vins.fillna('').astype(str)
+        ascii_only = text.map(str.isascii).to_numpy(dtype=bool)
+        encodable = (text.str.len() <= VIN_LENGTH).to_numpy(dtype=bool) & ascii_only
+        keys = text.where(encodable, '').str.encode('ascii').to_numpy(dtype=f'S{VIN_LENGTH}')
+
+        positions = np.searchsorted(self._vin, keys)
+        in_range = positions < len(self._vin)
+        positions = np.where(in_range, positions, 0)
+        exact = encodable & in_range & (self._vin[positions] == keys)
+
+        positions = np.where(exact, positions, -1)
+        match = np.where(exact, MATCH_EXACT, MATCH_MISS).astype(object)
+
+        misses = np.flatnonzero(~exact & ascii_only)
+        if len(misses):
+            prefixes = text.iloc[misses].str[:VIN_PREFIX_LENGTH].str.encode('ascii').to_numpy(dtype=f'S{VIN_PREFIX_LENGTH}')
+            lo = np.searchsorted(self._vin, prefixes, side='left')
+            hi = np.searchsorted(self._vin, np.char.add(prefixes, b'\xff'), side='left')
+
+            for i, start, stop in zip(misses, lo, hi):
+                if start < stop:
+                    positions[i] = start + int(np.argmin(self._row[start:stop]))
+                    match[i] = MATCH_PREFIX
+
+        found = positions >= 0
+        take = np.where(found, positions, 0)
+        return decoded_frame(
+            vins, match, found,
+            np.asarray(self._makes, dtype=object)[self._make_codes[take]],
+            np.asarray(self._models, dtype=object)[self._model_codes[take]],
+            np.asarray(self._years, dtype=object)[self._year_codes[take]],
+        )
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else VIN_DATASET_PATH
+    store_path = sys.argv[2] if len(sys.argv) > 2 else VIN_STORE_PATH
+
+    print(f"Building VIN store from {csv_path}...")
+    count = build_vin_store(csv_path, store_path)
+    print(f"✓ Wrote {count:,} VINs to {store_path}")
+    print(f"✓ Dictionaries saved to {_dictionary_path(store_path)}")
@@ -0,0 +1,251 @@
+"""
+Structural VIN Decoding
+Normalization (strip + uppercase) and validation (length, alphabet,
+position-9 check digit for North American VINs) to run before any lookup.
+Offline fallback for VINs absent from the VIN dataset:
+- WMI (chars 1-3) → make, from a table compiled from vin_dataset.csv
+- WMI + VDS (chars 1-8) → most common model for that pattern
+- Position 10 → model year
+
+Build the tables once:
+    python vin_structure.py [vin_dataset.csv] [vin_structure_tables.json]
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import date
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from vin_index import VIN_DATASET_PATH, MATCH_MISS
+
+VIN_STRUCTURE_PATH = 'vin_structure_tables.json'
+MATCH_STRUCTURE = 'structure'
+
+WMI_LENGTH = 3
+VDS_END = 8  # WMI + VDS (chars 4-8); char 9 is the check digit
+
+# Position 10 year codes: 1980-2000 letters, 2001-2009 digits, then the cycle repeats
+YEAR_CODES = 'ABCDEFGHJKLMNPRSTVWXY123456789'
+YEAR_CODE_TO_OFFSET = {code: i for i, code in enumerate(YEAR_CODES)}
+FIRST_CYCLE_START = 1980
+CYCLE_LENGTH = 30
+
+# Check digit: transliterated value × position weight, sum mod 11 (10 → 'X')
+VIN_LENGTH = 17
+VIN_TRANSLITERATION = {
+    **{str(d): d for d in range(10)},
+    'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8,
+    'J': 1, 'K': 2, 'L': 3, 'M': 4, 'N': 5, 'P': 7, 'R': 9,
+    'S': 2, 'T': 3, 'U': 4, 'V': 5, 'W': 6, 'X': 7, 'Y': 8, 'Z': 9,
+}
+VIN_WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+CHECK_DIGIT_POSITION = 8  # 0-based index of position 9
+
+# The check digit is only mandatory in North America (WMI region 1-5); European
+# and Asian manufacturers use position 9 freely, so it is not checked for them
+CHECK_DIGIT_REGIONS = frozenset('12345')
+
+
+# ============================================================
+# VALIDATION
+# ============================================================
+
+def compute_check_digit(vin: str) -> str:
+    """Expected position-9 check digit for a 17-char VIN over the allowed alphabet"""
+    total = sum(VIN_TRANSLITERATION[c] * w for c, w in zip(vin, VIN_WEIGHTS))
+    remainder = total % 11
+    return 'X' if remainder == 10 else str(remainder)
+
+
+def normalize_vin(vin: Any) -> Any:
+    """Strip surrounding whitespace and uppercase a VIN string (non-strings pass through)"""
+    return vin.strip().upper() if isinstance(vin, str) else vin
+
+
+def validate_vin(vin: Any, check_digit: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Fast-reject malformed VINs before any dataset lookup
+    Returns None if valid, otherwise a structured error:
+        {'code': 'length' | 'alphabet' | 'check_digit', 'message': ..., plus details}
+    The VIN is checked after normalize_vin, so case and surrounding spaces are not errors.
+    The check digit is only enforced for North American WMIs (first character 1-5)
+    """
+    vin = normalize_vin(vin)
+    if not isinstance(vin, str) or len(vin) != VIN_LENGTH:
+        length = len(vin) if isinstance(vin, str) else None
+        return {
+            'code': 'length',
+            'message': f"VIN must be {VIN_LENGTH} characters",
+            'length': length,
+        }
+
+    invalid = [(i + 1, c) for i, c in enumerate(vin) if c not in VIN_TRANSLITERATION]
+    if invalid:
+        return {
+            'code': 'alphabet',
+            'message': "VIN may only contain digits and letters other than I, O and Q",
+            'invalid_characters': [{'position': p, 'character': c} for p, c in invalid],
+        }
+
+    if check_digit and vin[0] in CHECK_DIGIT_REGIONS:
+        expected = compute_check_digit(vin)
+        found = vin[CHECK_DIGIT_POSITION]
+        if found != expected:
+            return {
+                'code': 'check_digit',
+                'message': f"Check digit mismatch at position 9 (expected {expected}, found {found})",
+                'expected': expected,
+                'found': found,
+            }
+
+    return None
+
+
+# ============================================================
+# MODEL YEAR
+# ============================================================
+
+def decode_model_year(vin: str) -> Optional[int]:
+    """
+    Decode model year from position 10
+    Position 7 disambiguates the 30-year cycle (digit → 1980-2009, letter → 2010-2039);
+    years more than one ahead of today roll back a cycle
+    """
+    if len(vin) < 10:
+        return None
+
+    offset = YEAR_CODE_TO_OFFSET.get(vin[9])
+    if offset is None:
+        return None
+
+    year = FIRST_CYCLE_START + offset
+    if vin[6].isalpha():
+        year += CYCLE_LENGTH
+    if year > date.today().year + 1:
+        year -= CYCLE_LENGTH
+
+    return year
+
+
+# ============================================================
+# BUILD
+# ============================================================
+
+def _most_common(vin_df: pd.DataFrame, key: str, value: str) -> Dict[str, Any]:
+    """Most frequent value per key (ties → first seen)"""
+    counts = vin_df.groupby([key, value], sort=False).size().reset_index(name='count')
+    counts = counts.sort_values('count', ascending=False, kind='stable').drop_duplicates(key)
+    return dict(zip(counts[key], counts[value]))
+
+
+def build_structure_tables(csv_path: str = VIN_DATASET_PATH,
+                           tables_path: str = VIN_STRUCTURE_PATH) -> Dict[str, int]:
+    """
+    Compile WMI → make and WMI+VDS → model tables from the VIN dataset
+    Returns table sizes
+    """
+    vin_df = pd.read_csv(csv_path, usecols=['VIN', 'Make', 'Model'])
+    vin_df = vin_df.dropna()
+    vin_df = vin_df[vin_df['VIN'].str.len() == VIN_LENGTH]
+
+    vin_df['wmi'] = vin_df['VIN'].str[:WMI_LENGTH]
+    vin_df['vds'] = vin_df['VIN'].str[:VDS_END]
+
+    tables = {
+        'wmi_make': _most_common(vin_df, 'wmi', 'Make'),
+        'wmi_model': _most_common(vin_df, 'wmi', 'Model'),
+        'vds_model': _most_common(vin_df, 'vds', 'Model'),
+    }
+
+    tmp_path = tables_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(tables, f)
+    os.replace(tmp_path, tables_path)
+
+    return {name: len(table) for name, table in tables.items()}
+
+
+# ============================================================
+# DECODE
+# ============================================================
+
+class StructuralDecoder:
+    """
+    Decode make/model/year from the VIN itself using precompiled tables
+    Every lookup is a dict hit, no table scan
+    """
+
+    def __init__(self, tables: Dict[str, Dict[str, str]]):
+        self._wmi_make = tables['wmi_make']
+        self._wmi_model = tables['wmi_model']
+        self._vds_model = tables['vds_model']
+
+    @classmethod
+    def from_file(cls, path: str = VIN_STRUCTURE_PATH) -> 'StructuralDecoder':
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def decode(self, vin: str) -> Optional[Dict[str, Any]]:
+        """Vehicle info from VIN structure, or None if the WMI is unknown"""
+        make = self._wmi_make.get(vin[:WMI_LENGTH])
+        if make is None:
+            return None
+
+        model = self._vds_model.get(vin[:VDS_END]) or self._wmi_model.get(vin[:WMI_LENGTH])
+
+        return {
+            'make': make,
+            'model': model,
+            'year': decode_model_year(vin),
+        }
+
+    def fill_misses(self, decoded: pd.DataFrame) -> pd.DataFrame:
+        """Decode the 'miss' rows of a decode_vins() result structurally"""
+        misses = np.flatnonzero((decoded['match'] == MATCH_MISS).to_numpy())
+        if not len(misses):
+            return decoded
+
+        decoded = decoded.astype({'make': object, 'model': object, 'year': object})
+        for i in misses:
+            vehicle = self.decode(str(decoded.iat[i, decoded.columns.get_loc('vin')]))
+            if vehicle is None:
+                continue
+            for column, value in vehicle.items():
+                decoded.iat[i, decoded.columns.get_loc(column)] = value
+            decoded.iat[i, decoded.columns.get_loc('match')] = MATCH_STRUCTURE
+
+        return decoded
+
+
+# ============================================================
+# SHARED INSTANCE
+# ============================================================
+
+_structural_decoder = None
+_structural_decoder_lock = threading.Lock()
+
+
+def get_structural_decoder() -> Optional[StructuralDecoder]:
+    """Return the process-wide structural decoder, or None if the tables have not been built"""
+    global _structural_decoder
+    if _structural_decoder is None and os.path.exists(VIN_STRUCTURE_PATH):
+        with _structural_decoder_lock:
+            if _structural_decoder is None:
+                _structural_decoder = StructuralDecoder.from_file(VIN_STRUCTURE_PATH)
+    return _structural_decoder
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else VIN_DATASET_PATH
+    tables_path = sys.argv[2] if len(sys.argv) > 2 else VIN_STRUCTURE_PATH
+
+    print(f"Compiling VIN structure tables from {csv_path}...")
+    sizes = build_structure_tables(csv_path, tables_path)
+    for name, size in sizes.items():
+        print(f"  ✓ {name}: {size:,} entries")
+    print(f"✓ Tables saved to {tables_path}")
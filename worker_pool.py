@@ -0,0 +1,176 @@
+"""
+Process-Pool Worker Mode
+Runs estimate_repair_cost in N worker processes, so the Python-level
+stages (dict building, consolidation, pandas filtering, formatting) scale
+across cores instead of serializing under one GIL
+
+- The parent loads the VIN index, OEM parts catalog, labor table and
+  structural VIN tables once, then forks: workers share those pages
+  copy-on-write (the binary VIN store is memory-mapped, so it is shared
+  through the page cache either way)
+- Each worker loads its own models (TensorFlow is never imported in the
+  parent) and pins inference to threads_per_worker intra-op threads,
+  so workers × threads_per_worker ≈ cores
+- Requests go to the first idle worker (one shared work queue); images
+  are sent encoded and decoded inside the worker
+- activate(model_dir) deploys new models without restarting workers: each
+  request carries the pool's model generation, and a worker that sees a
+  newer one activates that directory in its registry before running it
+
+Usage:
+    pool = EstimationWorkerPool(workers=8, threads_per_worker=4, backend='tflite')
+    estimate = pool.estimate(vin, [jpeg_bytes, ...])
+    futures = [pool.submit(vin, images) for vin, images in claims]
+    pool.activate('models/v2')
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from cost_estimation_pipeline import ML_CLASS_TO_OEM_PARTS, estimate_repair_cost
+from image_preprocessing import configure_image_preprocessor, reset_after_fork
+from labor_rates import get_labor_table
+from model_registry import BACKEND_KERAS, BACKEND_TFLITE, ModelRegistry, MODEL_DIR, discover_models
+from parts_catalog import get_parts_catalog
+from vin_index import get_vin_index
+from vin_structure import get_structural_decoder
+
+DEFAULT_THREADS_PER_WORKER = 2
+
+# Worker-process state (set by _init_worker)
+_worker_registry = None
+_worker_model_names = None
+_worker_cache = None
+_worker_generation = 0
+
+
+def preload_shared_data():
+    """Load every read-only lookup structure the pipeline uses into this process"""
+    get_vin_index()
+    get_structural_decoder()
+    get_parts_catalog(ML_CLASS_TO_OEM_PARTS)
+    get_labor_table()
+
+
+def limit_threads(num_threads: int):
+    """
+    Pin native thread pools to num_threads in this process
+    The env vars only reach runtimes that start later (TensorFlow, TFLite); the
+    BLAS/OpenMP pools numpy already started in the parent are resized with
+    threadpoolctl (installed with scikit-learn) when it is available
+    """
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS'):
+        os.environ[var] = str(num_threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(num_threads)
+
+
+def _init_worker(model_dir: str, backend: str, part: str, damage: str, num_threads: int, cache):
+    """Runs once in each worker: bounded threads, then load + warm the models"""
+    global _worker_registry, _worker_model_names, _worker_cache
+
+    reset_after_fork()
+    limit_threads(num_threads)
+    if backend == BACKEND_KERAS:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    configure_image_preprocessor(num_threads)
+
+    registry = ModelRegistry(model_dir, backend, num_threads=num_threads)
+    registry.pipeline_models(part, damage)  # Load + warm before the first request
+
+    _worker_registry = registry
+    _worker_model_names = (part, damage)
+    _worker_cache = cache
+
+
+def _run_estimate(vin: str, images: List, options: Dict[str, Any], generation: int, model_dir: str) -> Dict[str, Any]:
+    global _worker_generation
+
+    # First request after EstimationWorkerPool.activate: load + warm the new models here
+    # (on failure the registry keeps the old ones and this request errors; the next one retries)
+    if generation > _worker_generation:
+        _worker_registry.activate(model_dir)
+        _worker_generation = generation
+
+    part_model, damage_model = _worker_registry.pipeline_models(*_worker_model_names)
+    return estimate_repair_cost(vin, images, part_model, damage_model,
+                                cache=_worker_cache, preprocess=True, **options)
+
+
+class EstimationWorkerPool:
+    """Fork-based pool of estimation workers behind one dispatch queue"""
+
+    def __init__(self, workers: int = None, threads_per_worker: int = DEFAULT_THREADS_PER_WORKER,
+                 backend: str = BACKEND_TFLITE, part: str = 'part', damage: str = 'damage',
+                 model_dir: str = MODEL_DIR, cache=None):
+        """
+        cache: optional PredictionCache; each worker gets its own copy of the
+               in-memory tier, so give it a disk_dir to share entries across workers
+        """
+        self.threads_per_worker = threads_per_worker
+        self.workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.backend = backend
+        self.part = part
+
+        # Model deployment: (generation, directory) sent with every request
+        self._generation = 0
+        self._model_dir = str(model_dir)
+        self._lock = threading.Lock()
+
+        # Before fork: workers inherit the loaded tables instead of loading their own
+        preload_shared_data()
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_worker,
+            initargs=(str(model_dir), backend, part, damage, threads_per_worker, cache)
+        )
+
+    def submit(self, vin: str, images: List, **options) -> Future:
+        """
+        Queue one estimate; the first idle worker picks it up
+        images: encoded JPEG/PNG bytes or file paths (cheap to send to a worker)
+        options: extra estimate_repair_cost keyword arguments (e.g. cascade=True)
+        """
+        with self._lock:
+            generation, model_dir = self._generation, self._model_dir
+        return self._executor.submit(_run_estimate, vin, list(images), options, generation, model_dir)
+
+    def estimate(self, vin: str, images: List, timeout: Optional[float] = None, **options) -> Dict[str, Any]:
+        """Blocking estimate for one claim"""
+        return self.submit(vin, images, **options).result(timeout)
+
+    def activate(self, model_dir: str = None):
+        """
+        Switch every worker to the models in model_dir (default: reload the current directory)
+        Returns at once; each worker loads and warms the new models before the first
+        request submitted after this call (earlier requests run on whichever it has)
+        """
+        model_dir = str(model_dir) if model_dir is not None else self._model_dir
+        if self.part not in discover_models(model_dir, self.backend):
+            raise KeyError(f"No model '{self.part}' in {model_dir}")
+
+        with self._lock:
+            self._generation += 1
+            self._model_dir = model_dir
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> 'EstimationWorkerPool':
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()